@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from contextlib import ExitStack
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('foodgram.profiling')
+
+PLACEHOLDERS = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+SPACES = re.compile(r'\s+')
+TOP_STATEMENTS = 5
+_state = threading.local()
+
+
+def normalize_sql(sql):
+    return PLACEHOLDERS.sub('(%s, ...)', SPACES.sub(' ', sql)).strip()
+
+
+def stack_origin():
+    for frame in reversed(traceback.extract_stack()[:-1]):
+        filename = os.path.abspath(frame.filename)
+        if (
+            filename.startswith(settings.BASE_DIR)
+            and filename != os.path.abspath(__file__)
+            and 'site-packages' not in filename
+        ):
+            return (
+                f'{os.path.relpath(filename, settings.BASE_DIR)}:'
+                f'{frame.lineno} in {frame.name}'
+            )
+    return None
+
+
+class Profile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_finished = None
+        self.rendered = None
+        self.phases = {}
+        self.running = set()
+        self.queries = 0
+        self.db = 0.0
+        self.statements = {}
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.db += duration
+            self.record(normalize_sql(sql), duration)
+
+    def record(self, sql, duration):
+        statement = self.statements.get(sql)
+        if statement is None:
+            statement = self.statements[sql] = {
+                'sql': sql, 'count': 0, 'duration_ms': 0.0,
+                'origin': stack_origin(),
+            }
+        statement['count'] += 1
+        statement['duration_ms'] += duration
+        if duration >= settings.PROFILING_SLOW_QUERY_MS:
+            self.slow_queries.append({
+                'sql': sql,
+                'duration_ms': round(duration, 2),
+                'origin': statement['origin'],
+            })
+
+
+def profiled(phase):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = getattr(_state, 'profile', None)
+            if profile is None or phase in profile.running:
+                return func(*args, **kwargs)
+            profile.running.add(phase)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.running.discard(phase)
+                profile.phases[phase] = (
+                    profile.phases.get(phase, 0.0)
+                    + time.perf_counter() - started
+                )
+        return wrapper
+    return decorator
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = _state.profile = Profile()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _state.profile = None
+        finished = time.perf_counter()
+        timings = self.timings(profile, finished)
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration:.1f}'
+            + (f';desc="{profile.queries} queries"' if name == 'db' else '')
+            for name, duration in timings.items()
+        )
+        self.log(request, response, profile, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _state.profile.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        profile = _state.profile
+        profile.view_finished = time.perf_counter()
+
+        def rendered(response):
+            profile.rendered = time.perf_counter()
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def timings(self, profile, finished):
+        timings = {'total': (finished - profile.started) * 1000}
+        if profile.view_started is not None:
+            view_finished = profile.view_finished or finished
+            timings['view'] = (view_finished - profile.view_started) * 1000
+            if profile.view_finished is not None:
+                rendered = profile.rendered or finished
+                timings['render'] = (rendered - profile.view_finished) * 1000
+        timings['serialize'] = profile.phases.get('serialize', 0.0) * 1000
+        timings['db'] = profile.db
+        return timings
+
+    def log(self, request, response, profile, timings):
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match else None
+        for query in profile.slow_queries:
+            logger.warning(json.dumps(
+                {'event': 'slow_query', 'view': view, **query},
+                ensure_ascii=False
+            ))
+        if timings['total'] < settings.PROFILING_SLOW_REQUEST_MS:
+            return
+        statements = sorted(
+            profile.statements.values(),
+            key=lambda statement: -statement['duration_ms']
+        )[:TOP_STATEMENTS]
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.queries,
+            **{
+                f'{name}_ms': round(duration, 2)
+                for name, duration in timings.items()
+            },
+            'statements': [
+                {**statement, 'duration_ms': round(
+                    statement['duration_ms'], 2
+                )}
+                for statement in statements
+            ],
+        }, ensure_ascii=False))
@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'users',
     'recipes',
+    'jobs',
     'colorfield',
     'rest_framework',
     'rest_framework.authtoken',
@@ -44,6 +45,27 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
 ]
 
+if env.bool('PROFILING', default=False):
+    MIDDLEWARE.insert(0, 'foodgram.middleware.ProfilingMiddleware')
+
+PROFILING_SLOW_REQUEST_MS = env.int('PROFILING_SLOW_REQUEST_MS', default=500)
+PROFILING_SLOW_QUERY_MS = env.int('PROFILING_SLOW_QUERY_MS', default=100)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'foodgram.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'foodgram.urls'
 
 TEMPLATES = [
@@ -68,13 +90,23 @@ DATABASES = {
     'default': {
         'ENGINE': env('ENGINE', default='django.db.backends.postgresql'),
         'NAME': env('DB_NAME'),
-        'USER': env('POSTGRES_USER'),
-        'PASSWORD': env('POSTGRES_PASSWORD'),
-        'HOST': env('DB_HOST'),
-        'PORT': env('DB_PORT'),
+        'USER': env('POSTGRES_USER', default=''),
+        'PASSWORD': env('POSTGRES_PASSWORD', default=''),
+        'HOST': env('DB_HOST', default=''),
+        'PORT': env('DB_PORT', default=''),
+        'TEST': {'NAME': env('TEST_DB_NAME', default=None)},
     }
 }
 
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+RESPONSE_CACHE_TIMEOUT = env.int('RESPONSE_CACHE_TIMEOUT', default=600)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -109,7 +141,7 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
@@ -119,8 +151,22 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated'
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'recipes.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+TOKEN_CACHE_TTL = env.int(
+    'TOKEN_CACHE_TTL', default=300 if SHARED_CACHE else 0
+)
+TOKEN_CACHE_LOCAL_TTL = env.int('TOKEN_CACHE_LOCAL_TTL', default=5)
+TOKEN_CACHE_SIZE = env.int('TOKEN_CACHE_SIZE', default=1024)
+
+JOBS_INLINE = env.bool('JOBS_INLINE', default=False)
+JOBS_RETRY_DELAY = env.int('JOBS_RETRY_DELAY', default=30)
+JOBS_TIMEOUT = env.int('JOBS_TIMEOUT', default=600)
+
 
 DJOSER = {
     'PERMISSIONS': {
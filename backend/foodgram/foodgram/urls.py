@@ -5,4 +5,5 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('users.urls')),
     path('', include('recipes.urls')),
+    path('', include('jobs.urls')),
 ]
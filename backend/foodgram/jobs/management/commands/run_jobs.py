@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import StopFlag, run_workers, work
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчики фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='число процессов-обработчиков'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=1.0,
+            help='пауза между опросами очереди, секунд'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='выполнить накопившиеся задачи и выйти'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            work(options['poll'], StopFlag(), once=True)
+        else:
+            run_workers(options['workers'], options['poll'])
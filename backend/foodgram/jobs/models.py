@@ -0,0 +1,75 @@
+from django.db import models
+from django.utils import timezone
+
+from users.models import User
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'в очереди'),
+        (RUNNING, 'выполняется'),
+        (DONE, 'выполнена'),
+        (FAILED, 'ошибка'),
+    )
+
+    name = models.CharField(max_length=200, verbose_name='задача')
+    payload = models.TextField(default='{}', verbose_name='параметры')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED,
+        verbose_name='статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5,
+        verbose_name='максимум попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='запустить после'
+    )
+    started = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='начата'
+    )
+    finished = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='завершена'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='создана'
+    )
+    result = models.TextField(blank=True, verbose_name='результат')
+    error = models.TextField(blank=True, verbose_name='ошибка')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='пользователь'
+    )
+
+    class Meta:
+        ordering = ('-id',)
+        verbose_name = 'задача'
+        verbose_name_plural = 'задачи'
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'], name='jobs_status_run_at_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.id} ({self.status})'
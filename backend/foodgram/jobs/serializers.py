@@ -0,0 +1,21 @@
+import json
+
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    result = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = (
+            'id', 'name', 'status', 'attempts', 'created', 'finished',
+            'result'
+        )
+        model = Job
+
+    def get_result(self, obj):
+        if obj.result:
+            return json.loads(obj.result)
+        return None
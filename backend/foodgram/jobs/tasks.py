@@ -0,0 +1,76 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+REGISTRY = {}
+
+
+def task(name):
+    def register(func):
+        REGISTRY[name] = func
+        return func
+    return register
+
+
+def enqueue(name, user=None, **payload):
+    if name not in REGISTRY:
+        raise KeyError(f'неизвестная задача {name}')
+    job = Job.objects.create(
+        name=name, payload=json.dumps(payload), user=user
+    )
+    if settings.JOBS_INLINE:
+        claimed = claim_job(job.pk)
+        if claimed is not None:
+            job = run_job(claimed)
+    return job
+
+
+def claim_job(pk=None):
+    now = timezone.now()
+    claimable = Q(status=Job.QUEUED, run_at__lte=now) | Q(
+        status=Job.RUNNING,
+        started__lt=now - timedelta(seconds=settings.JOBS_TIMEOUT)
+    )
+    candidates = Job.objects.filter(claimable)
+    if pk is not None:
+        candidates = candidates.filter(pk=pk)
+    for job in candidates.order_by('run_at', 'id')[:10]:
+        claimed = Job.objects.filter(
+            pk=job.pk, status=job.status, started=job.started
+        ).update(
+            status=Job.RUNNING, started=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_job(job):
+    try:
+        if job.attempts > job.max_attempts:
+            raise RuntimeError('превышено число попыток')
+        func = REGISTRY[job.name]
+        result = func(**json.loads(job.payload))
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(seconds=delay)
+        else:
+            job.status = Job.FAILED
+            job.finished = timezone.now()
+        job.save(update_fields=['status', 'run_at', 'finished', 'error'])
+        return job
+    job.status = Job.DONE
+    job.result = json.dumps(result, ensure_ascii=False)
+    job.finished = timezone.now()
+    job.save(update_fields=['status', 'result', 'finished'])
+    return job
@@ -0,0 +1,139 @@
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Amount, Ingredient, Recipe, ShoppingCart
+from users.models import User
+from .models import Job
+from .tasks import claim_job, enqueue, run_job, task
+
+
+@task('jobs.tests.echo')
+def echo(value):
+    return value
+
+
+@task('jobs.tests.fail')
+def fail():
+    raise ValueError('сбой')
+
+
+@override_settings(JOBS_INLINE=True)
+class InlineJobTests(TestCase):
+    def test_runs_job(self):
+        job = enqueue('jobs.tests.echo', value=1)
+        self.assertEqual((job.status, job.result), (Job.DONE, '1'))
+
+    def test_job_claimed_elsewhere(self):
+        with mock.patch('jobs.tasks.claim_job', return_value=None):
+            job = enqueue('jobs.tests.echo', value=1)
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(Job.objects.get().status, Job.QUEUED)
+
+
+@override_settings(JOBS_INLINE=False, JOBS_RETRY_DELAY=10)
+class RetryTests(TestCase):
+    def setUp(self):
+        self.job = enqueue('jobs.tests.fail')
+        self.now = self.job.run_at
+        patcher = mock.patch(
+            'jobs.tasks.timezone.now', side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def attempt(self):
+        job = claim_job(self.job.pk)
+        self.assertIsNotNone(job)
+        return run_job(job)
+
+    def test_backoff_after_failure(self):
+        for attempt, delay in enumerate((10, 20, 40, 80), 1):
+            job = self.attempt()
+            self.assertEqual((job.status, job.attempts),
+                             (Job.QUEUED, attempt))
+            self.assertEqual(job.run_at, self.now + timedelta(seconds=delay))
+            self.assertIn('ValueError', job.error)
+            self.assertIsNone(claim_job(self.job.pk))
+            self.now = job.run_at
+
+    def test_failed_after_max_attempts(self):
+        Job.objects.filter(pk=self.job.pk).update(max_attempts=2)
+        self.attempt()
+        self.now += timedelta(seconds=10)
+        job = self.attempt()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertEqual(job.finished, self.now)
+        self.now += timedelta(days=1)
+        self.assertIsNone(claim_job(self.job.pk))
+
+
+@override_settings(JOBS_INLINE=False)
+class JobViewSetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner, cls.other = (
+            User.objects.create(email=f'{name}@example.com', username=name)
+            for name in ('owner', 'other')
+        )
+        cls.job = enqueue('jobs.tests.echo', user=cls.owner, value=1)
+        cls.path = f'/api/jobs/{cls.job.id}/'
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_owner_reads_status(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.json()['id'], response.json()['status']),
+            (self.job.id, Job.QUEUED)
+        )
+
+    def test_other_users(self):
+        self.assertEqual(self.client.get(self.path).status_code, 401)
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(self.path).status_code, 404)
+
+
+@override_settings(JOBS_INLINE=False)
+class ShoppingListExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            email='cook@example.com', username='cook'
+        )
+        recipe = Recipe.objects.create(
+            author=cls.user, name='каша', text='Сварить.', cooking_time=10
+        )
+        Amount.objects.create(
+            recipe=recipe, amount=200, ingredient=Ingredient.objects.create(
+                name='рис', measurement_unit='г'
+            )
+        )
+        ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+    def test_async_export(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(
+            '/api/recipes/download_shopping_cart/', {'async': 1}
+        )
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        job = Job.objects.get(id=data['id'])
+        self.assertEqual(
+            (job.name, job.user, data['status']),
+            ('recipes.export_shopping_list', self.user, Job.QUEUED)
+        )
+        self.assertTrue(data['url'].endswith(f'/api/jobs/{job.id}/'))
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(MEDIA_ROOT=directory):
+                run_job(claim_job(job.id))
+            response = client.get(data['url'])
+        self.assertEqual(response.json()['status'], Job.DONE)
+        self.assertTrue(response.json()['result']['url'].endswith('.txt'))
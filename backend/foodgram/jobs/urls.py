@@ -0,0 +1,11 @@
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+
+from . import views
+
+router_jobs = SimpleRouter()
+router_jobs.register('jobs', views.JobViewSet, basename='job')
+
+urlpatterns = [
+    path('api/', include(router_jobs.urls)),
+]
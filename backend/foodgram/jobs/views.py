@@ -0,0 +1,14 @@
+from rest_framework import mixins, viewsets
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    serializer_class = JobSerializer
+    lookup_field = 'id'
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(user=self.request.user)
@@ -0,0 +1,58 @@
+import multiprocessing
+import signal
+import time
+
+from django.db import connections
+
+from .tasks import claim_job, run_job
+
+
+class StopFlag:
+    def __init__(self):
+        self.requested = False
+
+    def set(self, *args):
+        self.requested = True
+
+    def is_set(self):
+        return self.requested
+
+
+def work(poll_interval, stop, once=False):
+    while not stop.is_set():
+        job = claim_job()
+        if job is not None:
+            run_job(job)
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+    connections.close_all()
+
+
+def _child(poll_interval):
+    stop = StopFlag()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, stop.set)
+    work(poll_interval, stop)
+
+
+def run_workers(processes, poll_interval):
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    stop = StopFlag()
+    signal.signal(signal.SIGTERM, stop.set)
+    signal.signal(signal.SIGINT, stop.set)
+    workers = [None] * processes
+    while not stop.is_set():
+        for position, worker in enumerate(workers):
+            if worker is None or not worker.is_alive():
+                workers[position] = context.Process(
+                    target=_child, args=(poll_interval,)
+                )
+                workers[position].start()
+        time.sleep(poll_interval)
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        worker.join()
@@ -6,10 +6,13 @@ from .forms import AmountChangeForm, AmountCreationForm
 from .models import (
     Amount, Favorite, Ingredient, Recipe, ShoppingCart, Subscription, Tag,
 )
+from .toggles import COUNTERS, recount_links
 
 
 class UserAdmin(admin.ModelAdmin):
-    list_display = ('email', 'username', 'is_staff')
+    list_display = (
+        'email', 'username', 'is_staff', 'recipes_count', 'followers_count'
+    )
     list_filter = ('username', 'email')
     fieldsets = (
         (None, {'fields': ('email', 'password', 'is_staff')}),
@@ -35,12 +38,16 @@ class IngredientAdmin(admin.ModelAdmin):
 
 class RecipeAdmin(admin.ModelAdmin):
     list_display = (
-        'id', 'author', 'name', 'image', 'get_ingredients', 'get_tags'
+        'id', 'author', 'name', 'image', 'get_ingredients', 'get_tags',
+        'favorites_count', 'carts_count'
     )
     search_fields = ('name',)
     list_filter = ('name', 'author', 'tags')
     empty_value_display = '-пусто-'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_related()
+
 
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name',)
@@ -59,20 +66,43 @@ class AmountAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-class FavoriteAdmin(admin.ModelAdmin):
+class LinkAdmin(admin.ModelAdmin):
+    def parent_ids(self, objs):
+        field = COUNTERS[self.model][0]
+        return {getattr(obj, f'{field}_id') for obj in objs}
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        field = COUNTERS[self.model][0]
+        ids = self.parent_ids([obj])
+        if form.initial.get(field) is not None:
+            ids.add(form.initial[field])
+        recount_links(self.model, ids)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recount_links(self.model, self.parent_ids([obj]))
+
+    def delete_queryset(self, request, queryset):
+        ids = self.parent_ids(queryset)
+        super().delete_queryset(request, queryset)
+        recount_links(self.model, ids)
+
+
+class FavoriteAdmin(LinkAdmin):
     list_display = ('user', 'recipe')
     search_fields = ('user',)
     list_filter = ('user',)
 
 
-class ShoppindCartAdmin(admin.ModelAdmin):
+class ShoppindCartAdmin(LinkAdmin):
     list_display = ('user', 'recipe')
     search_fields = ('user',)
     list_filter = ('user',)
     empty_value_display = '-пусто-'
 
 
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(LinkAdmin):
     list_display = ('user', 'author')
     search_fields = ('user',)
     list_filter = ('user',)
@@ -1,5 +1,8 @@
 from django.apps import AppConfig
 
 
-class ReciepesConfig(AppConfig):
-    name = 'reciepes'
+class RecipesConfig(AppConfig):
+    name = 'recipes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,209 @@
+import json
+import os
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.models import User
+from .models import Favorite, Recipe, ShoppingCart, Tag
+from .synthetic import generate
+
+SIZES = (100, 1000, 5000)
+BASELINE = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+TOLERANCE = 2.0
+TIME_SLACK_MS = 5.0
+UPDATE_INGREDIENTS = 30
+
+
+def build_dataset(size, seed=0):
+    dataset = generate(max(size // 10, 10), size, seed)
+    user = User.objects.annotate(carts_total=Count('carts')).order_by(
+        '-carts_total', 'id'
+    ).first()
+    taken = set(
+        Favorite.objects.filter(user=user).values_list('recipe_id', flat=True)
+    ) | set(
+        ShoppingCart.objects.filter(user=user).values_list(
+            'recipe_id', flat=True
+        )
+    )
+    return {
+        'user': user,
+        'token': Token.objects.create(user=user).key,
+        'author_id': User.objects.order_by('-recipes_count', 'id').first().id,
+        'tags': list(Tag.objects.values_list('slug', flat=True)[:2]),
+        'recipe_id': dataset.recipe_ids[-1],
+        'free_recipe_ids': [
+            pk for pk in dataset.recipe_ids if pk not in taken
+        ],
+        'ingredient_ids': dataset.ingredient_ids,
+        'tag_ids': dataset.tag_ids,
+    }
+
+
+def recipe_payload(data, name, offset):
+    ids = data['ingredient_ids']
+    return {
+        'name': name,
+        'text': 'текст рецепта',
+        'cooking_time': 10,
+        'tags': data['tag_ids'][:2],
+        'ingredients': [
+            {'id': ids[(offset + number) % len(ids)], 'amount': number + 1}
+            for number in range(UPDATE_INGREDIENTS)
+        ],
+    }
+
+
+def create_recipe(client, data, run):
+    return client.post(
+        '/api/recipes/',
+        recipe_payload(data, f'новый рецепт {run}', run),
+        format='json'
+    )
+
+
+def update_recipe(client, data, run):
+    if 'own_recipe_id' not in data:
+        data['own_recipe_id'] = Recipe.objects.create(
+            author=data['user'], name='свой рецепт', text='текст',
+            cooking_time=1
+        ).id
+    return client.put(
+        f'/api/recipes/{data["own_recipe_id"]}/',
+        recipe_payload(data, 'свой рецепт', run * 7),
+        format='json'
+    )
+
+
+def toggle(path, method):
+    def request(client, data, run):
+        recipe = data['free_recipe_ids'][run]
+        return getattr(client, method)(f'/api/recipes/{recipe}/{path}/')
+    return request
+
+
+SCENARIOS = {
+    'recipe_list': lambda client, data, run: client.get(
+        '/api/recipes/', {'limit': 6}
+    ),
+    'recipe_list_tags': lambda client, data, run: client.get(
+        '/api/recipes/', {'limit': 6, 'tags': data['tags']}
+    ),
+    'recipe_list_author': lambda client, data, run: client.get(
+        '/api/recipes/', {'limit': 6, 'author': data['author_id']}
+    ),
+    'recipe_list_favorited': lambda client, data, run: client.get(
+        '/api/recipes/', {'limit': 6, 'is_favorited': 1}
+    ),
+    'recipe_list_in_cart': lambda client, data, run: client.get(
+        '/api/recipes/', {'limit': 6, 'is_in_shopping_cart': 1}
+    ),
+    'recipe_list_search': lambda client, data, run: client.get(
+        '/api/recipes/', {'limit': 6, 'search': 'салат масло'}
+    ),
+    'recipe_detail': lambda client, data, run: client.get(
+        f'/api/recipes/{data["recipe_id"]}/'
+    ),
+    'recipe_create': create_recipe,
+    'recipe_update': update_recipe,
+    'subscriptions': lambda client, data, run: client.get(
+        '/api/users/subscriptions/', {'limit': 6, 'recipes_limit': 3}
+    ),
+    'favorite_add': toggle('favorite', 'get'),
+    'favorite_remove': toggle('favorite', 'delete'),
+    'shopping_cart_add': toggle('shopping_cart', 'get'),
+    'shopping_cart_remove': toggle('shopping_cart', 'delete'),
+    'download_shopping_cart': lambda client, data, run: client.get(
+        '/api/recipes/download_shopping_cart/'
+    ),
+}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def measure(request, client, data, repeat):
+    timings = []
+    queries = 0
+    for run in range(repeat + 1):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request(client, data, run)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 300:
+            raise BenchmarkError(
+                f'{response.status_code}: {response.content[:200]!r}'
+            )
+        if run:
+            timings.append(elapsed * 1000)
+            queries = max(queries, len(captured))
+    return {
+        'queries': queries,
+        'time_ms': round(statistics.median(timings), 2),
+    }
+
+
+def run_benchmarks(sizes=SIZES, repeat=5, seed=0, names=None):
+    results = {}
+    for size in sizes:
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+        data = build_dataset(size, seed)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {data["token"]}')
+        results[str(size)] = {}
+        for name, request in SCENARIOS.items():
+            if names and name not in names:
+                continue
+            try:
+                results[str(size)][name] = measure(
+                    request, client, data, repeat
+                )
+            except BenchmarkError as error:
+                raise BenchmarkError(f'{name} ({size}): {error}')
+    return results
+
+
+def load_baseline(path=BASELINE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(results, path=BASELINE):
+    with open(path, 'w', encoding='utf-8') as baseline:
+        json.dump(results, baseline, indent=2, sort_keys=True)
+        baseline.write('\n')
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    regressions = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            expected = baseline.get(size, {}).get(name)
+            if expected is None:
+                continue
+            if current['queries'] > expected['queries']:
+                regressions.append(
+                    f'{name} ({size}): запросов {current["queries"]} '
+                    f'вместо {expected["queries"]}'
+                )
+            limit = expected['time_ms'] * tolerance + TIME_SLACK_MS
+            if current['time_ms'] > limit:
+                regressions.append(
+                    f'{name} ({size}): {current["time_ms"]} мс '
+                    f'вместо {expected["time_ms"]} мс'
+                )
+    return regressions
@@ -0,0 +1,43 @@
+from django.apps import apps as global_apps
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def change_counter(model, pk, field, delta):
+    model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def _count(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), Value(0))
+
+
+def recount_counter(model, pks, field, related_model, related_field):
+    pks = list(model.objects.select_for_update().filter(
+        pk__in=pks
+    ).order_by('pk').values_list('pk', flat=True))
+    model.objects.filter(pk__in=pks).update(
+        **{field: _count(related_model, related_field)}
+    )
+
+
+def recount_counters(apps=global_apps):
+    user_model = apps.get_model('users', 'User')
+    recipe_model = apps.get_model('recipes', 'Recipe')
+    recipe_model.objects.update(
+        favorites_count=_count(
+            apps.get_model('recipes', 'Favorite'), 'recipe'
+        ),
+        carts_count=_count(
+            apps.get_model('recipes', 'ShoppingCart'), 'recipe'
+        )
+    )
+    user_model.objects.update(
+        recipes_count=_count(recipe_model, 'author'),
+        followers_count=_count(
+            apps.get_model('recipes', 'Subscription'), 'author'
+        )
+    )
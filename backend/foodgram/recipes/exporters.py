@@ -0,0 +1,61 @@
+import csv
+import json
+
+from django.db.models import Sum
+
+from .models import Amount
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def shopping_list(user):
+    return Amount.objects.filter(
+        recipe__carts__user=user
+    ).values(
+        'ingredient__name', 'ingredient__measurement_unit'
+    ).annotate(
+        total=Sum('amount')
+    ).order_by(
+        'ingredient__name', 'ingredient__measurement_unit'
+    )
+
+
+def export_txt(rows):
+    for row in rows:
+        yield (
+            f'{row["ingredient__name"]}, {row["total"]}, '
+            f'{row["ingredient__measurement_unit"]}\n'
+        )
+
+
+def export_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(['name', 'amount', 'measurement_unit'])
+    for row in rows:
+        yield writer.writerow([
+            row['ingredient__name'],
+            row['total'],
+            row['ingredient__measurement_unit']
+        ])
+
+
+def export_json(rows):
+    separator = '['
+    for row in rows:
+        yield separator + json.dumps({
+            'name': row['ingredient__name'],
+            'amount': row['total'],
+            'measurement_unit': row['ingredient__measurement_unit']
+        }, ensure_ascii=False)
+        separator = ','
+    yield ']' if separator == ',' else '[]'
+
+
+EXPORTERS = {
+    'txt': export_txt,
+    'csv': export_csv,
+    'json': export_json,
+}
@@ -1,21 +1,76 @@
+import time
+
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+
+from . import response_cache
+from .fulltext import search_recipes
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+
+USER_FLAGS = {
+    'is_favorited': Favorite,
+    'is_in_shopping_cart': ShoppingCart,
+}
+
+TAG_CHOICES_TTL = 60
+
+_tag_choices = {'version': None, 'loaded': 0, 'choices': []}
+
+
+def tag_choices():
+    version = response_cache.model_version(Tag)
+    if (_tag_choices['version'] != version
+            or time.monotonic() - _tag_choices['loaded'] > TAG_CHOICES_TTL):
+        _tag_choices['choices'] = list(
+            Tag.objects.values_list('slug', 'name')
+        )
+        _tag_choices['version'] = version
+        _tag_choices['loaded'] = time.monotonic()
+    return _tag_choices['choices']
 
-from .models import Ingredient, Recipe, Tag
+
+class FullTextSearchFilter(SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        return search_recipes(queryset, query)
+
+
+class RecipeOrderingFilter(BaseFilterBackend):
+    ordering_param = 'ordering'
+    orderings = {
+        'updated': ('updated', 'id'),
+        '-updated': ('-updated', '-id'),
+    }
+    default_ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        return self.orderings.get(
+            request.query_params.get(self.ordering_param),
+            self.default_ordering
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.orderings.get(
+            request.query_params.get(self.ordering_param)
+        )
+        if ordering is None:
+            return queryset
+        return queryset.order_by(*ordering)
 
 
 class RecipeFilter(filters.FilterSet):
     tags = filters.MultipleChoiceFilter(
-        choices=Tag.objects.all().values_list('slug', 'name'),
-        field_name='tags__slug', label='тэги'
+        choices=tag_choices, field_name='tags__slug', label='тэги',
+        method='check_tags'
     )
     author = filters.CharFilter(
         field_name='author__id', label='автор'
     )
     is_favorited = filters.BooleanFilter(
-        label='в избранных', method='check_fav'
+        label='в избранных', method='check_user_flag'
     )
     is_in_shopping_cart = filters.BooleanFilter(
-        label='в списке покупок', method='check_cart'
+        label='в списке покупок', method='check_user_flag'
     )
 
     class Meta:
@@ -23,28 +78,26 @@ class RecipeFilter(filters.FilterSet):
         fields = ['author', 'is_favorited',
                   'is_in_shopping_cart', 'tags']
 
-    def check_fav(self, queryset, name, value):
-        user_id = self.request.user.id
-        queryset = Recipe.objects.all()
-        if value is False:
-            queryset = queryset.exclude(favorites__user__id=user_id)
-        elif value is True:
-            queryset = queryset.filter(favorites__user__id=user_id)
-        return queryset
-
-    def check_cart(self, queryset, name, value):
-        user_id = self.request.user.id
-        queryset = Recipe.objects.all()
-        if value is False:
-            queryset = queryset.exclude(carts__user__id=user_id)
-        elif value is True:
-            queryset = queryset.filter(carts__user__id=user_id)
-        return queryset
+    def check_tags(self, queryset, name, value):
+        return queryset.filter(id__in=Recipe.tags.through.objects.filter(
+            tag__slug__in=value
+        ).values('recipe_id'))
+
+    def check_user_flag(self, queryset, name, value):
+        user = getattr(self.request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return queryset.none() if value else queryset
+        recipe_ids = USER_FLAGS[name].objects.filter(
+            user=user
+        ).values('recipe_id')
+        if value:
+            return queryset.filter(id__in=recipe_ids)
+        return queryset.exclude(id__in=recipe_ids)
 
 
 class IngredientFilter(filters.FilterSet):
     name = filters.CharFilter(
-        field_name='name', label='name', lookup_expr='gte'
+        field_name='name', label='name', lookup_expr='istartswith'
     )
 
     class Meta:
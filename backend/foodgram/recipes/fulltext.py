@@ -0,0 +1,105 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'recipes_recipe_fts'
+INGREDIENT_NAMES = (
+    'SELECT {agg} FROM recipes_amount a '
+    'JOIN recipes_ingredient i ON i.id = a.ingredient_id '
+    'WHERE a.recipe_id = r.id'
+)
+WORD = re.compile(r'\w+')
+
+
+def _words(query):
+    return WORD.findall(query.lower())[:16]
+
+
+def _ids_clause(column, ids):
+    if ids is None:
+        return '', []
+    return f' WHERE {column} IN ({", ".join(["%s"] * len(ids))})', list(ids)
+
+
+def index_recipes(ids=None, using=DEFAULT_DB_ALIAS):
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            where, params = _ids_clause('r.id', ids)
+            names = INGREDIENT_NAMES.format(agg="string_agg(i.name, ' ')")
+            cursor.execute(
+                'UPDATE recipes_recipe r SET search_vector = '
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', r.name), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+                f"coalesce(({names}), '')), 'B') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', r.text), 'C')"
+                + where,
+                params
+            )
+        elif connection.vendor == 'sqlite':
+            where, params = _ids_clause('rowid', ids)
+            cursor.execute(f'DELETE FROM {FTS_TABLE}' + where, params)
+            where, params = _ids_clause('r.id', ids)
+            names = INGREDIENT_NAMES.format(agg="group_concat(i.name, ' ')")
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, name, text, ingredients) '
+                f"SELECT r.id, r.name, r.text, coalesce(({names}), '') "
+                'FROM recipes_recipe r' + where,
+                params
+            )
+
+
+def unindex_recipes(ids):
+    if connection.vendor == 'sqlite' and ids:
+        where, params = _ids_clause('rowid', ids)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}' + where, params)
+
+
+def search_recipes(queryset, query):
+    words = _words(query)
+    if not words:
+        return queryset
+    if connection.vendor == 'postgresql':
+        tsquery = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        terms = ' & '.join(f'{word}:*' for word in words)
+        queryset = queryset.annotate(
+            search_rank=RawSQL(
+                f'ts_rank(recipes_recipe.search_vector, {tsquery})',
+                [terms], output_field=FloatField()
+            )
+        ).extra(
+            where=[f'recipes_recipe.search_vector @@ {tsquery}'],
+            params=[terms]
+        )
+    elif connection.vendor == 'sqlite':
+        terms = ' '.join(f'"{word}"*' for word in words)
+        queryset = queryset.extra(
+            select={'search_rank': f'-{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = recipes_recipe.id',
+                f'{FTS_TABLE} MATCH %s',
+                f"{FTS_TABLE}.rank MATCH 'bm25(10.0, 1.0, 4.0)'",
+            ],
+            params=[terms]
+        )
+    else:
+        condition = Q()
+        for word in words:
+            condition &= (
+                Q(name__icontains=word)
+                | Q(text__icontains=word)
+                | Q(ingredients__name__icontains=word)
+            )
+        queryset = queryset.filter(
+            id__in=queryset.model.objects.filter(condition).values('id')
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset.order_by('-search_rank', '-id')
@@ -0,0 +1,61 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, features
+
+IMAGE_SIZES = {
+    'thumbnail': (480, 360),
+    'detail': (1200, 900),
+}
+IMAGE_FORMATS = {
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+if features.check('webp'):
+    IMAGE_FORMATS['webp'] = ('WEBP', {'quality': 80, 'method': 4})
+
+
+def derivative_name(name, size, ext):
+    stem, _ = os.path.splitext(name)
+    return f'{stem}_{size}.{ext}'
+
+
+def derivative_names(name):
+    return {
+        (size if ext == 'jpg' else f'{size}_{ext}'):
+            derivative_name(name, size, ext)
+        for size in IMAGE_SIZES
+        for ext in IMAGE_FORMATS
+    }
+
+
+def has_derivatives(image):
+    return all(
+        image.storage.exists(name)
+        for name in derivative_names(image.name).values()
+    )
+
+
+def build_derivatives(image):
+    storage = image.storage
+    if not storage.exists(image.name):
+        return False
+    with image.open('rb') as source:
+        original = Image.open(source)
+        original.load()
+    if original.mode != 'RGB':
+        background = Image.new('RGB', original.size, (255, 255, 255))
+        rgba = original.convert('RGBA')
+        background.paste(rgba, mask=rgba.split()[-1])
+        original = background
+    for size, bounds in IMAGE_SIZES.items():
+        resized = original.copy()
+        resized.thumbnail(bounds, Image.LANCZOS)
+        for ext, (image_format, options) in IMAGE_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            name = derivative_name(image.name, size, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+    return True
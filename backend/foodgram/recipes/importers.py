@@ -0,0 +1,209 @@
+import csv
+import json
+import os
+from io import StringIO
+
+from django.apps import apps
+from django.core.serializers.python import Deserializer
+from django.db import connection
+
+from .models import Ingredient, Recipe
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 1 << 16
+LOOKUP_SIZE = 500
+NATURAL_KEYS = {
+    'users.user': ('email',),
+    'recipes.tag': ('slug',),
+    'recipes.ingredient': ('name', 'measurement_unit'),
+    'recipes.recipe': ('name',),
+    'authtoken.token': ('key',),
+}
+LINKS = (
+    'recipes.amount',
+    'recipes.favorite',
+    'recipes.shoppingcart',
+    'recipes.subscription',
+)
+ORDER = tuple(NATURAL_KEYS) + LINKS
+
+
+def iter_json_array(stream):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and buffer[position:position + 1] == '[':
+                started = True
+                position += 1
+                continue
+            if buffer[position:position + 1] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break
+            yield item
+        if not chunk:
+            return
+
+
+def iter_csv(stream):
+    for row in csv.reader(stream):
+        if row:
+            yield {'name': row[0], 'measurement_unit': row[1]}
+
+
+def iter_records(path):
+    with open(path, encoding='utf-8') as stream:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            yield from iter_csv(stream)
+        else:
+            yield from iter_json_array(stream)
+
+
+def copy_rows(model, objs, fields):
+    columns = ', '.join(model._meta.get_field(name).column for name in fields)
+    data = StringIO()
+    csv.writer(data).writerows(
+        [getattr(obj, name) for name in fields] for obj in objs
+    )
+    data.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {model._meta.db_table} ({columns}) '
+            'FROM STDIN WITH (FORMAT csv)',
+            data
+        )
+
+
+class Importer:
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.pks = {label: {} for label in NATURAL_KEYS}
+        self.recipe_tags = []
+        self.recipe_ids = set()
+        self.rows = 0
+
+    def load(self, path):
+        for record in iter_records(path):
+            self.rows += 1
+            if 'model' not in record:
+                self.add('recipes.ingredient', Ingredient(
+                    name=record['name'],
+                    measurement_unit=record['measurement_unit']
+                ))
+            elif record['model'] in ORDER:
+                obj = next(Deserializer([record], ignorenonexistent=True))
+                self.add(record['model'], obj.object, obj.m2m_data)
+        self.flush()
+
+    def add(self, label, obj, m2m_data=None):
+        obj.fixture_pk = obj.pk
+        if label == 'recipes.recipe':
+            obj.tag_pks = (m2m_data or {}).get('tags', [])
+        buffer = self.buffers.setdefault(label, [])
+        buffer.append(obj)
+        if len(buffer) >= self.batch_size:
+            self.flush(label)
+
+    def flush(self, label=None):
+        for current in ORDER[:ORDER.index(label) + 1] if label else ORDER:
+            if current in NATURAL_KEYS:
+                self.flush_natural(current, self.buffers.pop(current, []))
+            else:
+                self.flush_links(current, self.buffers.pop(current, []))
+        self.flush_recipe_tags(final=label is None)
+
+    def remap(self, obj):
+        for field in obj._meta.concrete_fields:
+            if field.is_relation:
+                pks = self.pks.get(field.related_model._meta.label_lower)
+                value = getattr(obj, field.attname)
+                if pks and value in pks:
+                    setattr(obj, field.attname, pks[value])
+
+    def existing(self, model, keys, objs):
+        values = list({getattr(obj, keys[0]) for obj in objs})
+        found = {}
+        for start in range(0, len(values), LOOKUP_SIZE):
+            found.update(
+                (row[:-1], row[-1])
+                for row in model.objects.filter(**{
+                    f'{keys[0]}__in': values[start:start + LOOKUP_SIZE]
+                }).values_list(*keys, 'pk')
+            )
+        return found
+
+    def insert(self, model, objs):
+        if not objs:
+            return
+        if model is Ingredient and connection.vendor == 'postgresql':
+            copy_rows(model, objs, ('name', 'measurement_unit'))
+        else:
+            model.objects.bulk_create(objs, ignore_conflicts=True)
+
+    def flush_natural(self, label, objs):
+        if not objs:
+            return
+        model = apps.get_model(label)
+        keys = NATURAL_KEYS[label]
+        keep_pk = keys == (model._meta.pk.name,)
+        for obj in objs:
+            self.remap(obj)
+        found = self.existing(model, keys, objs)
+        new = {}
+        for obj in objs:
+            key = tuple(getattr(obj, name) for name in keys)
+            if key not in found and key not in new:
+                if not keep_pk:
+                    obj.pk = None
+                new[key] = obj
+        self.insert(model, list(new.values()))
+        if new:
+            found.update(self.existing(model, keys, new.values()))
+        pks = self.pks[label]
+        for obj in objs:
+            obj.pk = found[tuple(getattr(obj, name) for name in keys)]
+            if obj.fixture_pk is not None:
+                pks[obj.fixture_pk] = obj.pk
+        if model is Recipe:
+            self.add_recipe_tags(objs, {found[key] for key in new})
+
+    def add_recipe_tags(self, recipes, created):
+        self.recipe_ids.update(created)
+        for recipe in recipes:
+            if recipe.pk in self.recipe_ids:
+                self.recipe_tags.extend(
+                    (recipe.pk, tag_pk) for tag_pk in recipe.tag_pks
+                )
+
+    def flush_links(self, label, objs):
+        for obj in objs:
+            self.remap(obj)
+            obj.pk = None
+        self.insert(apps.get_model(label), objs)
+
+    def flush_recipe_tags(self, final):
+        tags = self.pks['recipes.tag']
+        through = Recipe.tags.through
+        ready = [
+            through(recipe_id=recipe_id, tag_id=tags.get(tag_pk, tag_pk))
+            for recipe_id, tag_pk in self.recipe_tags
+            if final or tag_pk in tags
+        ]
+        self.recipe_tags = [
+            link for link in self.recipe_tags
+            if not final and link[1] not in tags
+        ]
+        self.insert(through, ready)
@@ -0,0 +1,148 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from . import response_cache
+from .models import Ingredient
+
+DEFAULT_LIMIT = 20
+REFRESH_INTERVAL = 60
+FUZZY_MIN_LENGTH = 3
+FUZZY_CHARS_PER_EDIT = 3
+
+
+def normalize(value):
+    return ' '.join(value.casefold().replace('ё', 'е').split())
+
+
+def trigrams(value):
+    padded = f'  {value} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def char_masks(value):
+    masks = {}
+    for position, char in enumerate(value):
+        masks[char] = masks.get(char, 0) | 1 << position
+    return masks
+
+
+def edit_distance(masks, length, target):
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, distance = full, 0, length
+    for char in target:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        up = negative | ~(horizontal | positive) & full
+        down = positive & horizontal
+        if up & last:
+            distance += 1
+        elif down & last:
+            distance -= 1
+        up = (up << 1 | 1) & full
+        down = down << 1 & full
+        positive = down | ~(vertical | up) & full
+        negative = up & vertical
+    return distance
+
+
+def fuzzy_terms(query, key):
+    terms = {key[:len(query)], *key.split()}
+    if ' ' in query:
+        terms.add(key)
+    return terms
+
+
+def fuzzy_matches(keys, postings, query, seen):
+    edits = len(query) // FUZZY_CHARS_PER_EDIT
+    candidates = set()
+    for gram in trigrams(query):
+        candidates.update(postings.get(gram, ()))
+    masks = char_masks(query)
+    matches = []
+    distances = {}
+    for position in candidates - seen:
+        key = keys[position]
+        terms = fuzzy_terms(query, key)
+        for term in terms:
+            if term not in distances:
+                distances[term] = edit_distance(masks, len(query), term)
+        best = min(distances[term] for term in terms)
+        if best <= edits:
+            start = distances[key[:len(query)]]
+            matches.append((best, start, len(key), key, position))
+    matches.sort()
+    return [match[-1] for match in matches]
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._built_at = 0
+
+    def build(self):
+        rows = sorted(
+            (normalize(name), pk, name, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        )
+        keys = [row[0] for row in rows]
+        items = [
+            {'id': row[1], 'name': row[2], 'measurement_unit': row[3]}
+            for row in rows
+        ]
+        postings = {}
+        for position, key in enumerate(keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, array('I')).append(position)
+        return keys, items, postings
+
+    def snapshot(self):
+        version = response_cache.model_version(Ingredient)
+        snapshot = self._snapshot
+        if (snapshot is None or self._version != version
+                or time.monotonic() - self._built_at > REFRESH_INTERVAL):
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self._snapshot = self.build()
+                    self._version = version
+                    self._built_at = time.monotonic()
+                snapshot = self._snapshot
+        return snapshot
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        keys, items, postings = self.snapshot()
+        query = normalize(query)
+        if not query:
+            return items[:limit]
+        found = []
+        seen = set()
+        position = bisect_left(keys, query)
+        while (position < len(keys) and len(found) < limit
+               and keys[position].startswith(query)):
+            found.append(position)
+            seen.add(position)
+            position += 1
+        if len(found) < limit:
+            substring = sorted(
+                (keys[position].find(query), keys[position], position)
+                for position in range(len(keys))
+                if position not in seen and query in keys[position]
+            )
+            for _, _, position in substring[:limit - len(found)]:
+                found.append(position)
+                seen.add(position)
+        if len(found) < limit and len(query) >= FUZZY_MIN_LENGTH:
+            found.extend(fuzzy_matches(
+                keys, postings, query, seen
+            )[:limit - len(found)])
+        return [items[position] for position in found]
+
+
+ingredient_index = IngredientIndex()
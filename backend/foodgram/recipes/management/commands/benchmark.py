@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+
+from recipes.benchmark import (
+    BASELINE, SCENARIOS, SIZES, TOLERANCE, BenchmarkError, compare,
+    load_baseline, run_benchmarks, save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время и число SQL-запросов основных эндпоинтов на '
+        'синтетических данных и сравнивает с базовой линией'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help=f'сценарии: {", ".join(SCENARIOS)}; по умолчанию все'
+        )
+        parser.add_argument(
+            '--sizes', type=lambda value: [int(size) for size in
+                                           value.split(',')],
+            default=SIZES, help='количества рецептов через запятую'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='число замеров каждого сценария'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--baseline', default=BASELINE)
+        parser.add_argument(
+            '--tolerance', type=float, default=TOLERANCE,
+            help='допустимое замедление относительно базовой линии, раз'
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help='записать результаты как новую базовую линию'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                'бенчмарк запускается на SQLite: '
+                'ENGINE=django.db.backends.sqlite3'
+            )
+        unknown = set(options['names']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(
+                f'неизвестные сценарии: {", ".join(sorted(unknown))}'
+            )
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = run_benchmarks(
+                options['sizes'], options['repeat'], options['seed'],
+                options['names']
+            )
+        except BenchmarkError as error:
+            raise CommandError(error)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+        baseline = load_baseline(options['baseline'])
+        for size, scenarios in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'рецептов: {size}'
+            ))
+            for name, result in scenarios.items():
+                expected = baseline.get(size, {}).get(name, {})
+                self.stdout.write(
+                    f'  {name:<24} {result["queries"]:>4} запросов '
+                    f'({expected.get("queries", "-")})  '
+                    f'{result["time_ms"]:>9.2f} мс '
+                    f'({expected.get("time_ms", "-")})'
+                )
+        if options['update']:
+            save_baseline(results, options['baseline'])
+            self.stdout.write(self.style.SUCCESS('базовая линия обновлена'))
+            return
+        regressions = compare(results, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError(
+                'регрессии производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('регрессий не найдено'))
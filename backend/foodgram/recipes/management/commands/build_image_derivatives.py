@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.images import build_derivatives, has_derivatives
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии и WebP-версии картинок рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='пересоздать уже существующие копии'
+        )
+
+    def handle(self, *args, **options):
+        built = 0
+        for recipe in Recipe.objects.exclude(image='').exclude(
+                image__isnull=True).only(
+                    'id', 'image', 'derivatives_ready').iterator():
+            ready = has_derivatives(recipe.image)
+            if options['force'] or not ready:
+                ready = build_derivatives(recipe.image)
+                built += 1
+            if ready != recipe.derivatives_ready:
+                Recipe.objects.filter(id=recipe.id).update(
+                    derivatives_ready=ready, updated=timezone.now()
+                )
+        self.stdout.write(self.style.SUCCESS(f'обработано картинок: {built}'))
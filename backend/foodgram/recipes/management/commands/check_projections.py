@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.projection_check import (
+    CASES, CHUNK_SIZE, benchmark_projections, check_projections,
+)
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ответы быстрых проекций с сериализаторами и замеряет '
+        'процессорное время'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help=f'проверяемые ответы: {", ".join(CASES)}; по умолчанию все'
+        )
+        parser.add_argument(
+            '--user', type=int,
+            help='id пользователя, от имени которого строятся ответы; '
+                 'по умолчанию проверяются аноним и первый подписчик'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='объектов в одном ответе'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5, help='повторов замера'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(CASES)
+        if unknown:
+            raise CommandError(
+                f'неизвестные ответы: {", ".join(sorted(unknown))}'
+            )
+        if options['user']:
+            users = [User.objects.get(id=options['user'])]
+        else:
+            users = [None, User.objects.filter(
+                followers__isnull=False
+            ).order_by('id').first()]
+        failed = []
+        for user in users:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'пользователь: {user or "аноним"}'
+            ))
+            for name, checked, mismatches in check_projections(
+                user, options['chunk_size'], options['names']
+            ):
+                self.stdout.write(
+                    f'  {name:<16}{checked:>8} объектов, '
+                    f'расхождений: {len(mismatches)}'
+                )
+                failed.extend(f'{name}: {ids[0]}..{ids[-1]}'
+                              for ids in mismatches)
+            for name, count, legacy, cold, warm in benchmark_projections(
+                user, options['chunk_size'], options['repeat'],
+                options['names']
+            ):
+                self.stdout.write(
+                    f'  {name:<16}{count:>8} объектов: '
+                    f'{legacy:8.2f} мс -> {cold:8.2f} мс без кэша '
+                    f'(x{legacy / max(cold, 0.001):.1f}), '
+                    f'{warm:8.2f} мс с кэшем '
+                    f'(x{legacy / max(warm, 0.001):.1f})'
+                )
+        if failed:
+            raise CommandError(
+                'ответы отличаются: ' + ', '.join(failed)
+            )
+        self.stdout.write(self.style.SUCCESS('ответы совпадают'))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from recipes.query_plans import CANONICAL_QUERIES, SCAN_PATTERNS, check_plans
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит планы выполнения основных запросов и отмечает '
+        'полные просмотры таблиц'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help=f'запросы для проверки: {", ".join(CANONICAL_QUERIES)}; '
+                 'по умолчанию все'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='завершиться с ошибкой, если найден полный просмотр'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SCAN_PATTERNS:
+            raise CommandError(
+                f'планы для {connection.vendor} не поддерживаются'
+            )
+        unknown = set(options['names']) - set(CANONICAL_QUERIES)
+        if unknown:
+            raise CommandError(
+                f'неизвестные запросы: {", ".join(sorted(unknown))}'
+            )
+        failed = []
+        for name, plan, scans in check_plans(options['names']):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            if scans:
+                failed.append(name)
+                self.stdout.write(self.style.WARNING(
+                    f'полный просмотр: {", ".join(scans)}'
+                ))
+            self.stdout.write('')
+        if failed and options['check']:
+            raise CommandError(
+                f'полный просмотр таблиц в запросах: {", ".join(failed)}'
+            )
+        if not failed:
+            self.stdout.write(self.style.SUCCESS(
+                'полных просмотров таблиц не найдено'
+            ))
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes import response_cache
+from recipes.models import Ingredient, Tag
+from recipes.synthetic import BATCH_SIZE, INGREDIENTS, generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, рецепты, избранное, списки '
+        'покупок и подписки с неравномерным (Zipf) распределением'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--favorites', type=float, default=20,
+            help='среднее число избранных рецептов у пользователя'
+        )
+        parser.add_argument(
+            '--carts', type=float, default=5,
+            help='среднее число рецептов в списке покупок'
+        )
+        parser.add_argument(
+            '--subscriptions', type=float, default=10,
+            help='среднее число подписок у пользователя'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--ingredients', default=INGREDIENTS,
+            help='файл ингредиентов для пустой базы'
+        )
+        parser.add_argument(
+            '--password', default='password',
+            help='пароль всех созданных пользователей'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            result = generate(
+                options['users'], options['recipes'], options['seed'],
+                favorites=options['favorites'], carts=options['carts'],
+                subscriptions=options['subscriptions'],
+                ingredients_path=options['ingredients'],
+                password=options['password'],
+                batch_size=options['batch_size']
+            )
+        response_cache.invalidate(Ingredient)
+        response_cache.invalidate(Tag)
+        self.stdout.write(self.style.SUCCESS(
+            f'создано пользователей: {len(result.user_ids)}, '
+            f'рецептов: {len(result.recipe_ids)} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
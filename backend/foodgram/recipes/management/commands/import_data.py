@@ -0,0 +1,50 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes import response_cache
+from recipes.counters import recount_counters
+from recipes.fulltext import index_recipes
+from recipes.importers import BATCH_SIZE, ORDER, Importer
+from recipes.models import Ingredient, Recipe, Tag
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты (json, csv) и дампы рецептов пачками, '
+        'пропуская уже существующие записи'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='файлы для загрузки')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='количество строк в одной вставке'
+        )
+
+    def handle(self, *args, **options):
+        models = [apps.get_model(label) for label in ORDER]
+        models.append(Recipe.tags.through)
+        for path in options['paths']:
+            before = {model: model.objects.count() for model in models}
+            importer = Importer(options['batch_size'])
+            started = time.monotonic()
+            with transaction.atomic():
+                importer.load(path)
+                index_recipes(importer.recipe_ids)
+                recount_counters()
+            elapsed = time.monotonic() - started
+            for model in models:
+                created = model.objects.count() - before[model]
+                if created:
+                    self.stdout.write(
+                        f'  {model._meta.verbose_name_plural}: +{created}'
+                    )
+            self.stdout.write(self.style.SUCCESS(
+                f'{path}: {importer.rows} строк за {elapsed:.2f} с '
+                f'({importer.rows / max(elapsed, 1e-6):.0f} строк/с)'
+            ))
+        response_cache.invalidate(Ingredient)
+        response_cache.invalidate(Tag)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes.fulltext import index_recipes
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс рецептов'
+
+    def handle(self, *args, **options):
+        index_recipes()
+        self.stdout.write(self.style.SUCCESS('индекс рецептов перестроен'))
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.10 on 2026-10-18 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipe_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='derivatives_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='уменьшенные копии готовы'),
+        ),
+    ]
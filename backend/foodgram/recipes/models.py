@@ -1,11 +1,24 @@
 from colorfield.fields import ColorField
 from django.db import models
+from django.db.models import (
+    BooleanField, Exists, F, OuterRef, Prefetch, Value, Window,
+)
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 
 from users.models import User
 from .validators import validator_amount, validator_time
 
 
-class Ingredient(models.Model):
+class UpdatedOnSaveMixin:
+    def save(self, *args, **kwargs):
+        self.updated = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated'}
+        super().save(*args, **kwargs)
+
+
+class Ingredient(UpdatedOnSaveMixin, models.Model):
     name = models.CharField(
         max_length=200,
         verbose_name='название'
@@ -14,6 +27,11 @@ class Ingredient(models.Model):
         max_length=200,
         verbose_name='мера'
     )
+    updated = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name='изменён'
+    )
 
     class Meta:
         ordering = ('name',)
@@ -24,7 +42,63 @@ class Ingredient(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField())
+            )
+        return self.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            ))
+        )
+
+    def touch(self):
+        return self.update(updated=timezone.now())
+
+    def with_related(self):
+        return self.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'quantities',
+                queryset=Amount.objects.select_related('ingredient')
+            )
+        )
+
+    def ranked_by_author(self, author_ids):
+        return self.filter(author__id__in=author_ids).annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('author_id')],
+                order_by=F('id').desc()
+            )
+        ).order_by().values(
+            'id', 'name', 'image', 'derivatives_ready', 'cooking_time',
+            'author_id', 'row_number'
+        )
+
+    def latest_by_author(self, author_ids, limit):
+        recipes = {author_id: [] for author_id in author_ids}
+        if not author_ids or limit <= 0:
+            return recipes
+        sql, params = self.ranked_by_author(
+            author_ids
+        ).query.sql_with_params()
+        for recipe in self.model.objects.raw(
+            f'SELECT * FROM ({sql}) ranked WHERE row_number <= %s '
+            'ORDER BY author_id, row_number',
+            params + (limit,)
+        ):
+            recipes[recipe.author_id].append(recipe)
+        return recipes
+
+
+class Recipe(UpdatedOnSaveMixin, models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -59,6 +133,33 @@ class Recipe(models.Model):
         verbose_name='время приготовления',
         validators=[validator_time]
     )
+    favorites_count = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='в избранном'
+    )
+    carts_count = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='в списках покупок'
+    )
+    derivatives_ready = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='уменьшенные копии готовы'
+    )
+    created = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name='создан'
+    )
+    updated = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name='изменён'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     REQUIRED_FIELDS = [
         'author', 'name', 'image', 'ingredients',
@@ -69,26 +170,49 @@ class Recipe(models.Model):
         ordering = ('-id',)
         verbose_name = 'рецепт'
         verbose_name_plural = 'рецепты'
+        indexes = [
+            models.Index(
+                fields=['author', '-id'], name='recipe_author_id_idx'
+            ),
+            models.Index(
+                fields=['-updated', '-id'], name='recipe_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def _prefetched(self, name):
+        return name in getattr(self, '_prefetched_objects_cache', {})
+
     def get_ingredients(self):
-        results = []
-        amounts = list(Amount.objects.filter(
-            recipe__id=self.id).values_list(
-                'ingredient__name', 'amount', 'ingredient__measurement_unit'))
-        for amount in amounts:
-            results.append(f'{amount[0]} {amount[1]} {amount[2]}')
-        return ', '.join(results)
+        if self._prefetched('quantities'):
+            amounts = [
+                (
+                    amount.ingredient.name, amount.amount,
+                    amount.ingredient.measurement_unit
+                )
+                for amount in self.quantities.all()
+            ]
+        else:
+            amounts = list(Amount.objects.filter(
+                recipe__id=self.id).values_list(
+                    'ingredient__name', 'amount',
+                    'ingredient__measurement_unit'))
+        return ', '.join(
+            f'{name} {amount} {unit}' for name, amount, unit in amounts
+        )
 
     def get_tags(self):
-        tags = list(Tag.objects.filter(
-            recipes__id=self.id).values_list('name', flat=True))
+        if self._prefetched('tags'):
+            tags = [tag.name for tag in self.tags.all()]
+        else:
+            tags = list(Tag.objects.filter(
+                recipes__id=self.id).values_list('name', flat=True))
         return ', '.join(tags)
 
 
-class Tag(models.Model):
+class Tag(UpdatedOnSaveMixin, models.Model):
     name = models.CharField(
         verbose_name='название',
         max_length=200
@@ -99,6 +223,11 @@ class Tag(models.Model):
         verbose_name='слаг'
     )
     colour = ColorField(default='#FF0000')
+    updated = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name='изменён'
+    )
 
     class Meta:
         ordering = ('name',)
@@ -213,6 +342,12 @@ class Amount(models.Model):
                 name='uniq_amount',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'ingredient', 'amount'],
+                name='amount_recipe_ingredient_idx'
+            ),
+        ]
 
     def __str__(self):
         return str(self.amount)
@@ -0,0 +1,191 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from users.models import User
+from users.serializers import UserSerializer
+from .models import Ingredient, Recipe, Subscription
+from .projections import (
+    INGREDIENT_FIELDS, RECIPE_FIELDS, USER_FIELDS, fragment_key,
+    project_recipes, project_subscriptions, project_users,
+)
+from .renderers import FastJSONRenderer
+from .serializers import (
+    IngredientSerializer, RecipeSerializer, SubscribeSerializer,
+    get_recipes_limit, subscribe_context,
+)
+
+CHUNK_SIZE = 100
+
+
+def make_request(user):
+    request = Request(RequestFactory().get('/api/', {'recipes_limit': 3}))
+    request.user = user or AnonymousUser()
+    return request
+
+
+def subscriptions(user):
+    if not user.is_authenticated:
+        return set()
+    return set(Subscription.objects.filter(user=user).values_list(
+        'author__id', flat=True
+    ))
+
+
+def legacy_recipes(request, ids):
+    queryset = Recipe.objects.with_user_flags(request.user).filter(
+        id__in=ids
+    ).with_related()
+    return RecipeSerializer(queryset, many=True, context={
+        'request': request, 'subscriptions': subscriptions(request.user),
+    }).data
+
+
+def fast_recipes(request, ids):
+    rows = Recipe.objects.with_user_flags(request.user).filter(
+        id__in=ids
+    ).values(*RECIPE_FIELDS)
+    return project_recipes(list(rows), request, subscriptions(request.user))
+
+
+def legacy_users(request, ids):
+    return UserSerializer(
+        User.objects.filter(id__in=ids), many=True,
+        context={'request': request}
+    ).data
+
+
+def fast_users(request, ids):
+    return project_users(
+        list(User.objects.filter(id__in=ids).values(*USER_FIELDS)), request
+    )
+
+
+def legacy_subscriptions(request, ids):
+    authors = list(User.objects.filter(id__in=ids))
+    return SubscribeSerializer(
+        authors, many=True, context=subscribe_context(request, authors)
+    ).data
+
+
+def fast_subscriptions(request, ids):
+    rows = list(User.objects.filter(id__in=ids).values(
+        *USER_FIELDS, 'recipes_count'
+    ))
+    return project_subscriptions(rows, Recipe.objects.latest_by_author(
+        [row['id'] for row in rows], get_recipes_limit(request)
+    ))
+
+
+def legacy_ingredients(request, ids):
+    return IngredientSerializer(
+        Ingredient.objects.filter(id__in=ids), many=True
+    ).data
+
+
+def fast_ingredients(request, ids):
+    return list(Ingredient.objects.filter(id__in=ids).values(
+        *INGREDIENT_FIELDS
+    ))
+
+
+CASES = {
+    'recipes': (
+        lambda user: Recipe.objects.values_list('id', flat=True),
+        legacy_recipes, fast_recipes,
+    ),
+    'users': (
+        lambda user: User.objects.values_list('id', flat=True),
+        legacy_users, fast_users,
+    ),
+    'subscriptions': (
+        lambda user: User.objects.filter(
+            followings__user__id=user.id
+        ).values_list('id', flat=True) if user.is_authenticated else [],
+        legacy_subscriptions, fast_subscriptions,
+    ),
+    'ingredients': (
+        lambda user: Ingredient.objects.values_list('id', flat=True),
+        legacy_ingredients, fast_ingredients,
+    ),
+}
+
+
+def clear_fragments(ids):
+    cache.delete_many([
+        fragment_key(row['id'], row['updated'])
+        for row in Recipe.objects.filter(id__in=ids).values('id', 'updated')
+    ])
+
+
+CACHE_RESETS = {
+    'recipes': clear_fragments,
+}
+
+
+def chunks(ids, size):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def render(legacy, fast, request, ids):
+    return (
+        JSONRenderer().render(legacy(request, ids)),
+        FastJSONRenderer().render(fast(request, ids)),
+    )
+
+
+def check_projections(user=None, chunk_size=CHUNK_SIZE, names=None):
+    request = make_request(user)
+    for name, (objects, legacy, fast) in CASES.items():
+        if names and name not in names:
+            continue
+        checked = 0
+        mismatches = []
+        for ids in chunks(objects(request.user), chunk_size):
+            expected, actual = render(legacy, fast, request, ids)
+            checked += len(ids)
+            if expected != actual:
+                mismatches.append(ids)
+        yield name, checked, mismatches
+
+
+def cpu_time(func, request, ids, repeat, reset=None):
+    timings = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset(ids)
+        started = time.process_time()
+        func(request, ids)
+        timings.append(time.process_time() - started)
+    return min(timings) * 1000
+
+
+def benchmark_projections(user=None, chunk_size=CHUNK_SIZE, repeat=5,
+                          names=None):
+    request = make_request(user)
+    for name, (objects, legacy, fast) in CASES.items():
+        if names and name not in names:
+            continue
+        ids = list(objects(request.user)[:chunk_size])
+        if not ids:
+            continue
+
+        def render_fast(request, ids):
+            return FastJSONRenderer().render(fast(request, ids))
+
+        warm = cpu_time(render_fast, request, ids, repeat)
+        cold = warm
+        if name in CACHE_RESETS:
+            cold = cpu_time(
+                render_fast, request, ids, repeat, CACHE_RESETS[name]
+            )
+        yield name, len(ids), cpu_time(
+            lambda request, ids: JSONRenderer().render(legacy(request, ids)),
+            request, ids, repeat
+        ), cold, warm
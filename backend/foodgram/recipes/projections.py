@@ -0,0 +1,227 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+from foodgram.middleware import profiled
+from .images import derivative_names
+from .models import Amount, Recipe, Subscription
+
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name')
+RECIPE_FIELDS = (
+    'id', 'author_id', 'updated', 'is_favorited', 'is_in_shopping_cart',
+)
+FRAGMENT_FIELDS = (
+    'id', 'updated', 'name', 'image', 'derivatives_ready', 'text',
+    'cooking_time',
+) + tuple(f'author__{name}' for name in USER_FIELDS)
+FRAGMENT_VERSION = 2
+FRAGMENT_TIMEOUT = 24 * 60 * 60
+INGREDIENT_FIELDS = ('id', 'name', 'measurement_unit')
+image_storage = Recipe._meta.get_field('image').storage
+
+
+def absolute_url(url, request):
+    if url is None or request is None:
+        return url
+    return request.build_absolute_uri(url)
+
+
+def image_url(name, request):
+    if not name:
+        return None
+    return absolute_url(image_storage.url(name), request)
+
+
+def image_urls(name, ready, request):
+    if not name:
+        return None
+    return {
+        size: image_url(derivative if ready else name, request)
+        for size, derivative in derivative_names(name).items()
+    }
+
+
+def subscribed_to(user, author_ids):
+    if not user.is_authenticated or not author_ids:
+        return set()
+    return set(Subscription.objects.filter(
+        user=user, author_id__in=author_ids
+    ).values_list('author_id', flat=True))
+
+
+def project_user(row, subscriptions):
+    return {
+        'id': row['id'],
+        'username': row['username'],
+        'email': row['email'],
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'is_subscribed': row['id'] in subscriptions,
+    }
+
+
+@profiled('serialize')
+def project_users(rows, request):
+    subscriptions = subscribed_to(request.user, [row['id'] for row in rows])
+    return [project_user(row, subscriptions) for row in rows]
+
+
+def project_short_recipe(recipe, request):
+    image = recipe.image.name if recipe.image else None
+    return {
+        'id': recipe.id,
+        'name': recipe.name,
+        'image': image_url(image, request),
+        'images': image_urls(image, recipe.derivatives_ready, request),
+        'cooking_time': recipe.cooking_time,
+    }
+
+
+@profiled('serialize')
+def project_subscriptions(rows, recipes):
+    return [
+        {
+            'id': row['id'],
+            'username': row['username'],
+            'email': row['email'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'recipes': [
+                project_short_recipe(recipe, None)
+                for recipe in recipes.get(row['id'], [])
+            ],
+            'recipes_count': row['recipes_count'],
+            'is_subscribed': True,
+        }
+        for row in rows
+    ]
+
+
+def recipe_tags(recipe_ids):
+    tags = {pk: [] for pk in recipe_ids}
+    for recipe_id, *tag in Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('tag__name').values_list(
+        'recipe_id', 'tag__id', 'tag__name', 'tag__slug', 'tag__colour'
+    ):
+        tags[recipe_id].append(
+            dict(zip(('id', 'name', 'slug', 'colour'), tag))
+        )
+    return tags
+
+
+def recipe_ingredients(recipe_ids):
+    ingredients = {pk: [] for pk in recipe_ids}
+    for recipe_id, pk, name, amount, unit in Amount.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list(
+        'recipe_id', 'ingredient__id', 'ingredient__name', 'amount',
+        'ingredient__measurement_unit'
+    ):
+        ingredients[recipe_id].append({
+            'id': pk,
+            'name': name,
+            'amount': float(amount),
+            'measurement_unit': unit,
+        })
+    return ingredients
+
+
+def version(updated):
+    return int(updated.timestamp() * 1000000)
+
+
+def fragment_key(pk, updated):
+    return f'recipe-fragment:{FRAGMENT_VERSION}:{pk}:{version(updated)}'
+
+
+def build_fragments(recipe_ids):
+    rows = list(Recipe.objects.filter(id__in=recipe_ids).values(
+        *FRAGMENT_FIELDS
+    ))
+    recipe_ids = [row['id'] for row in rows]
+    tags = recipe_tags(recipe_ids)
+    ingredients = recipe_ingredients(recipe_ids)
+    return {
+        row['id']: (row['updated'], {
+            'id': row['id'],
+            'author': {name: row[f'author__{name}'] for name in USER_FIELDS},
+            'name': row['name'],
+            'image': image_url(row['image'], None),
+            'images': image_urls(
+                row['image'], row['derivatives_ready'], None
+            ),
+            'tags': tags[row['id']],
+            'ingredients': ingredients[row['id']],
+            'text': row['text'],
+            'cooking_time': row['cooking_time'],
+        })
+        for row in rows
+    }
+
+
+def recipe_fragments(rows):
+    keys = {fragment_key(row['id'], row['updated']): row['id'] for row in rows}
+    fragments = {
+        keys[key]: fragment
+        for key, fragment in cache.get_many(list(keys)).items()
+    }
+    missing = [row['id'] for row in rows if row['id'] not in fragments]
+    if missing:
+        built = build_fragments(missing)
+        cache.set_many(
+            {
+                fragment_key(pk, updated): fragment
+                for pk, (updated, fragment) in built.items()
+            },
+            FRAGMENT_TIMEOUT
+        )
+        fragments.update(
+            (pk, fragment) for pk, (updated, fragment) in built.items()
+        )
+    return fragments
+
+
+def recipes_etag(rows, subscriptions, *parts):
+    digest = hashlib.md5(f'{FRAGMENT_VERSION}:{parts}'.encode())
+    for row in rows:
+        digest.update((
+            f'|{row["id"]}:{version(row["updated"])}:'
+            f'{row["is_favorited"]:d}{row["is_in_shopping_cart"]:d}'
+            f'{row["author_id"] in subscriptions:d}'
+        ).encode())
+    return quote_etag(digest.hexdigest())
+
+
+@profiled('serialize')
+def project_recipes(rows, request, subscriptions):
+    if not rows:
+        return []
+    fragments = recipe_fragments(rows)
+    recipes = []
+    for row in rows:
+        fragment = fragments.get(row['id'])
+        if fragment is None:
+            continue
+        author = fragment['author']
+        images = fragment['images']
+        recipes.append({
+            'id': fragment['id'],
+            'author': {
+                **author, 'is_subscribed': author['id'] in subscriptions,
+            },
+            'name': fragment['name'],
+            'image': absolute_url(fragment['image'], request),
+            'images': images and {
+                size: absolute_url(url, request)
+                for size, url in images.items()
+            },
+            'tags': fragment['tags'],
+            'ingredients': fragment['ingredients'],
+            'is_favorited': row['is_favorited'],
+            'is_in_shopping_cart': row['is_in_shopping_cart'],
+            'text': fragment['text'],
+            'cooking_time': fragment['cooking_time'],
+        })
+    return recipes
@@ -0,0 +1,90 @@
+import re
+from types import SimpleNamespace
+
+from django.db import connection, transaction
+
+from users.models import User
+from .exporters import shopping_list
+from .filters import RecipeFilter
+from .models import Amount, Recipe, Tag
+
+PAGE_SIZE = 6
+SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)'),
+}
+
+
+def filtered_recipes(sample, **params):
+    queryset = Recipe.objects.with_user_flags(sample.user)
+    filterset = RecipeFilter(
+        queryset=queryset, request=SimpleNamespace(user=sample.user)
+    )
+    for name, value in params.items():
+        queryset = filterset.filters[name].filter(queryset, value)
+    return queryset[:PAGE_SIZE]
+
+
+CANONICAL_QUERIES = {
+    'recipes_by_author': lambda sample: filtered_recipes(
+        sample, author=str(sample.user.id)
+    ),
+    'recipes_by_tags': lambda sample: filtered_recipes(
+        sample, tags=[sample.tag]
+    ),
+    'favorited_recipes': lambda sample: filtered_recipes(
+        sample, is_favorited=True
+    ),
+    'recipes_in_shopping_cart': lambda sample: filtered_recipes(
+        sample, is_in_shopping_cart=True
+    ),
+    'recipe_ingredients': lambda sample: Amount.objects.filter(
+        recipe__in=sample.recipe_ids
+    ).select_related('ingredient'),
+    'recipe_tags': lambda sample: Tag.objects.filter(
+        recipes__in=sample.recipe_ids
+    ),
+    'latest_by_author': lambda sample: Recipe.objects.ranked_by_author(
+        [sample.user.id]
+    ),
+    'subscriptions': lambda sample: User.objects.filter(
+        followings__user__id=sample.user.id
+    )[:PAGE_SIZE],
+    'shopping_list': lambda sample: shopping_list(sample.user),
+}
+
+
+def get_sample():
+    return SimpleNamespace(
+        user=User.objects.order_by('id').first() or User(id=0),
+        tag=Tag.objects.values_list('slug', flat=True).first() or '',
+        recipe_ids=list(
+            Recipe.objects.values_list('id', flat=True)[:PAGE_SIZE]
+        ) or [0],
+    )
+
+
+def explain(queryset):
+    if connection.vendor != 'postgresql':
+        return queryset.explain()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def full_scans(plan):
+    pattern = SCAN_PATTERNS[connection.vendor]
+    tables = set(connection.introspection.table_names())
+    return sorted({
+        table for table in pattern.findall(plan) if table in tables
+    })
+
+
+def check_plans(names=None):
+    sample = get_sample()
+    for name, build in CANONICAL_QUERIES.items():
+        if names and name not in names:
+            continue
+        plan = explain(build(sample))
+        yield name, plan, full_scans(plan)
@@ -0,0 +1,68 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+CACHED_HEADERS = ('Allow', 'Vary')
+
+
+def _version_key(model):
+    return f'response-cache:{model._meta.label_lower}'
+
+
+def model_version(model):
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), settings.RESPONSE_CACHE_TIMEOUT)
+        version = cache.get(key, time.time())
+    return version
+
+
+def invalidate(model):
+    cache.set(
+        _version_key(model), time.time(), settings.RESPONSE_CACHE_TIMEOUT
+    )
+
+
+def response_key(model, version, request):
+    path = f'{request.get_full_path()}|{request.META.get("HTTP_ACCEPT", "")}'
+    digest = hashlib.md5(path.encode()).hexdigest()
+    return f'response:{model._meta.label_lower}:{version}:{digest}'
+
+
+def store(key, response, last_modified):
+    content = response.content
+    entry = {
+        'last_modified': last_modified,
+        'content': content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.md5(content).hexdigest()),
+        'headers': {
+            header: response[header]
+            for header in CACHED_HEADERS if response.has_header(header)
+        },
+    }
+    cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+    return entry
+
+
+def build_response(request, entry):
+    last_modified = entry.get('last_modified')
+    response = get_conditional_response(
+        request, etag=entry['etag'], last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(
+            entry['content'], content_type=entry['content_type']
+        )
+        for header, value in entry['headers'].items():
+            response[header] = value
+    response['ETag'] = entry['etag']
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
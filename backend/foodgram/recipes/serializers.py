@@ -2,14 +2,16 @@ import base64
 import uuid
 
 from django.core.files.base import ContentFile
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 from rest_framework.relations import SlugRelatedField
 # from rest_framework.response import Response
 from rest_framework.validators import UniqueTogetherValidator
 
 from users.models import User
 from users.serializers import UserSerializer
+from .images import derivative_names
 from .models import (
     Amount, Favorite, Ingredient, Recipe, ShoppingCart, Subscription, Tag,
 )
@@ -17,14 +19,14 @@ from .models import (
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'slug', 'colour')
         model = Tag
         lookup_field = 'id'
 
 
 class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'measurement_unit')
         model = Ingredient
 
 
@@ -71,6 +73,21 @@ class MyImageField(serializers.ImageField):
         return django_field.clean(data)
 
 
+class ImageDerivativesField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        ready = value.instance.derivatives_ready
+        urls = {}
+        for size, name in derivative_names(value.name).items():
+            url = value.storage.url(name if ready else value.name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[size] = url
+        return urls
+
+
 class BaseRecipeSerializer(serializers.ModelSerializer):
     author = UserSerializer(many=False, read_only=True)
     tags = SlugRelatedField(
@@ -90,18 +107,15 @@ class BaseRecipeSerializer(serializers.ModelSerializer):
             'cooking_time'
         )
 
-    def create_amount(instance, ingr):
-        ingredient = get_object_or_404(Ingredient, id=ingr['id'])
-        amount = float(ingr['amount'])
-        Amount.objects.create(
-            recipe=instance, ingredient=ingredient, amount=amount
-        )
-
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user_id = self.context['request'].user.id
         return Favorite.objects.filter(user__id=user_id, recipe=obj).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user_id = self.context['request'].user.id
         return ShoppingCart.objects.filter(
             user__id=user_id, recipe=obj
@@ -111,11 +125,12 @@ class BaseRecipeSerializer(serializers.ModelSerializer):
 class RecipeSerializer(BaseRecipeSerializer):
     ingredients = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
+    images = ImageDerivativesField(source='image')
 
     class Meta:
         model = Recipe
         fields = (
-            'id', 'author', 'name', 'image', 'tags', 'ingredients',
+            'id', 'author', 'name', 'image', 'images', 'tags', 'ingredients',
             'is_favorited', 'is_in_shopping_cart', 'text',
             'cooking_time'
         )
@@ -141,33 +156,73 @@ class RecipeCreateSerializer(BaseRecipeSerializer):
 
     def validate(self, data):
         ingredients = self.context['request'].data['ingredients']
-        ingr_list = []
-        for ingr in ingredients:
-            ingredient = get_object_or_404(Ingredient, id=ingr['id'])
-            if ingredient not in ingr_list:
-                ingr_list.append(ingredient)
-            else:
+        ids = [int(ingr['id']) for ingr in ingredients]
+        found = Ingredient.objects.in_bulk(ids)
+        seen = set()
+        data['ingredients'] = []
+        for ingr_id, ingr in zip(ids, ingredients):
+            ingredient = found.get(ingr_id)
+            if ingredient is None:
+                raise NotFound(f'ингредиент {ingr_id} не найден')
+            if ingr_id in seen:
                 raise serializers.ValidationError(
                     f'вы несколько раз используете {ingredient.name}'
                 )
-            if float(ingr['amount']) < 0:
+            seen.add(ingr_id)
+            amount = float(ingr['amount'])
+            if amount < 0:
                 raise serializers.ValidationError(
                     f'вы ввели отрицательное количество {ingredient.name}'
                 )
+            data['ingredients'].append(
+                {'ingredient': ingredient, 'amount': amount}
+            )
         return data
 
+    def create_amounts(self, instance, ingredients):
+        Amount.objects.bulk_create([
+            Amount(
+                recipe=instance,
+                ingredient=ingr['ingredient'],
+                amount=ingr['amount']
+            )
+            for ingr in ingredients
+        ])
+
+    def update_amounts(self, instance, ingredients):
+        current = {
+            amount.ingredient_id: amount
+            for amount in instance.quantities.all()
+        }
+        new = {ingr['ingredient'].id: ingr for ingr in ingredients}
+        removed = current.keys() - new.keys()
+        if removed:
+            instance.quantities.filter(ingredient__id__in=removed).delete()
+        changed = []
+        for ingr_id in current.keys() & new.keys():
+            amount = current[ingr_id]
+            if amount.amount != new[ingr_id]['amount']:
+                amount.amount = new[ingr_id]['amount']
+                changed.append(amount)
+        if changed:
+            Amount.objects.bulk_update(changed, ['amount'])
+        self.create_amounts(
+            instance,
+            [new[ingr_id] for ingr_id in new.keys() - current.keys()]
+        )
+
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
-        ingredients = self.context['request'].data['ingredients']
-        validated_data.pop('ingredients')
+        ingredients = validated_data.pop('ingredients')
         instance = Recipe.objects.create(
             author=self.context['request'].user, **validated_data
         )
         instance.tags.set(tags)
-        for ingr in ingredients:
-            RecipeCreateSerializer.create_amount(instance, ingr)
+        self.create_amounts(instance, ingredients)
         return instance
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags = self.context['request'].data['tags']
         instance.tags.set(tags)
@@ -178,12 +233,8 @@ class RecipeCreateSerializer(BaseRecipeSerializer):
             instance.cooking_time
         )
         instance.image = validated_data.get('image', instance.image)
-        for ingr in instance.quantities.all():
-            ingr.delete()
-        ingredients = self.context['request'].data['ingredients']
-        for ingr in ingredients:
-            RecipeSerializer.create_amount(instance, ingr)
-        instance.save()
+        self.update_amounts(instance, validated_data['ingredients'])
+        instance.save(update_fields=['name', 'text', 'cooking_time', 'image'])
         return instance
 
 
@@ -208,11 +259,34 @@ class FavoriteSerializer(serializers.ModelSerializer):
 
 
 class ShortRecipeSerializer(serializers.ModelSerializer):
+    images = ImageDerivativesField(source='image')
+
     class Meta:
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'images', 'cooking_time')
         model = Recipe
 
 
+RECIPES_LIMIT = 10
+
+
+def get_recipes_limit(request):
+    limit = request.query_params.get('recipes_limit', '')
+    if limit.isdigit():
+        return int(limit)
+    return RECIPES_LIMIT
+
+
+def subscribe_context(request, authors):
+    author_ids = [author.id for author in authors]
+    return {
+        'request': request,
+        'subscriptions': set(author_ids),
+        'recipes': Recipe.objects.latest_by_author(
+            author_ids, get_recipes_limit(request)
+        ),
+    }
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     user = serializers.SlugRelatedField(
         slug_field='id',
@@ -233,7 +307,8 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         ), ]
 
     def get_recipes(self, obj):
-        instance = obj.author.recipes
+        limit = get_recipes_limit(self.context['request'])
+        instance = obj.author.recipes.all()[:limit]
         serializer = ShortRecipeSerializer(instance, many=True, read_only=True)
         return serializer.data
 
@@ -249,10 +324,22 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
         ), ]
 
 
+BATCH_LIMIT = 100
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False, max_length=BATCH_LIMIT
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
 class SubscribeSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField()
     recipes_count = serializers.SerializerMethodField()
-    is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
         fields = (
@@ -265,18 +352,14 @@ class SubscribeSerializer(UserSerializer):
         }
 
     def get_recipes(self, obj):
-        limit = 10
-        r_limit = self.context['request'].query_params.get('recipes_limit')
-        if r_limit:
-            limit = r_limit
-        queryset = obj.recipes.all()[:int(limit)]
+        recipes = self.context.get('recipes')
+        if recipes is not None:
+            queryset = recipes.get(obj.id, [])
+        else:
+            limit = get_recipes_limit(self.context['request'])
+            queryset = obj.recipes.all()[:limit]
         serializer = ShortRecipeSerializer(queryset, many=True)
         return serializer.data
 
     def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
-    def get_is_subscribed(self, obj):
-        return Subscription.objects.filter(
-            author=obj, user__id=self.context['request'].user.id
-        ).exists()
+        return obj.recipes_count
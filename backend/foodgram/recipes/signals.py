@@ -0,0 +1,175 @@
+import threading
+import weakref
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from jobs.tasks import enqueue
+from users.models import User
+from . import response_cache
+from .counters import change_counter
+from .fulltext import index_recipes, unindex_recipes
+from .images import has_derivatives
+from .models import Amount, Ingredient, Recipe, Tag
+from .toggles import COUNTERS, recount_links
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_response_cache(sender, **kwargs):
+    transaction.on_commit(partial(response_cache.invalidate, sender))
+
+
+batches = threading.local()
+
+
+class ScheduledIds:
+    def __init__(self, func, ids, batch):
+        self.func = func
+        self.ids = ids
+        self.batch = batch
+
+    def __call__(self):
+        if self.batch['done']:
+            return
+        self.batch['done'] = True
+        scheduled = (ref() for ref in self.batch['refs'])
+        self.func(set().union(*(
+            entry.ids for entry in scheduled if entry is not None
+        )))
+
+
+def schedule(func, ids):
+    if not transaction.get_connection().in_atomic_block:
+        func(set(ids))
+        return
+    if not hasattr(batches, 'pending'):
+        batches.pending = {}
+    batch = batches.pending.get(func)
+    # callbacks dropped by a rollback are freed, so a batch whose
+    # callbacks are all gone belongs to a rolled back transaction
+    if batch is None or batch['done'] or not any(
+        ref() is not None for ref in batch['refs']
+    ):
+        batch = batches.pending[func] = {'done': False, 'refs': []}
+    entry = ScheduledIds(func, set(ids), batch)
+    batch['refs'].append(weakref.ref(entry))
+    transaction.on_commit(entry)
+
+
+@receiver(post_save, sender=Ingredient)
+def reindex_ingredient_recipes(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        schedule(
+            index_recipes,
+            instance.quantities.values_list('recipe__id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def reindex_recipe(sender, instance, **kwargs):
+    schedule(index_recipes, [instance.id])
+
+
+@receiver(post_save, sender=Recipe)
+def build_image_derivatives(sender, instance, raw, **kwargs):
+    if not instance.image or raw:
+        return
+    ready = has_derivatives(instance.image)
+    if ready != instance.derivatives_ready:
+        Recipe.objects.filter(id=instance.id).update(derivatives_ready=ready)
+        instance.derivatives_ready = ready
+    if not ready:
+        transaction.on_commit(partial(
+            enqueue, 'recipes.build_image_derivatives', recipe_id=instance.id
+        ))
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_recipe(sender, instance, **kwargs):
+    schedule(unindex_recipes, [instance.id])
+
+
+@receiver([post_save, post_delete], sender=Amount)
+def reindex_amount_recipe(sender, instance, **kwargs):
+    schedule(index_recipes, [instance.recipe_id])
+
+
+def touch_recipes(ids):
+    Recipe.objects.filter(id__in=ids).touch()
+
+
+@receiver([post_save, post_delete], sender=Amount)
+def touch_amount_recipe(sender, instance, **kwargs):
+    schedule(touch_recipes, [instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def touch_tagged_recipes(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        schedule(touch_recipes, [instance.id])
+    elif pk_set is not None:
+        schedule(touch_recipes, pk_set)
+    else:
+        schedule(
+            touch_recipes,
+            instance.recipes.values_list('id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_tag_recipes(sender, instance, **kwargs):
+    schedule(touch_recipes, Recipe.tags.through.objects.filter(
+        tag=instance
+    ).values_list('recipe_id', flat=True))
+
+
+@receiver(post_save, sender=Ingredient)
+def touch_ingredient_recipes(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        schedule(
+            touch_recipes,
+            instance.quantities.values_list('recipe_id', flat=True)
+        )
+
+
+@receiver(post_save, sender=User)
+def touch_author_recipes(sender, instance, created, update_fields,
+                         **kwargs):
+    if created or (
+        update_fields and set(update_fields) <= {'last_login', 'password'}
+    ):
+        return
+    schedule(
+        touch_recipes,
+        instance.recipes.values_list('id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        change_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(pre_delete, sender=User)
+def recount_user_links(sender, instance, **kwargs):
+    for model, (field, _, _) in COUNTERS.items():
+        ids = list(model.objects.filter(user=instance).values_list(
+            f'{field}_id', flat=True
+        ))
+        if ids:
+            transaction.on_commit(partial(recount_links, model, ids))
@@ -0,0 +1,195 @@
+import itertools
+import os
+import random
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+
+from users.models import User
+from .counters import recount_counters
+from .fulltext import index_recipes
+from .importers import Importer
+from .models import (
+    Amount, Favorite, Ingredient, Recipe, ShoppingCart, Subscription, Tag,
+)
+
+BATCH_SIZE = 5000
+INDEX_CHUNK = 500
+ZIPF_EXPONENT = 1.1
+INGREDIENTS = os.path.normpath(os.path.join(
+    settings.BASE_DIR, '..', '..', 'data', 'ingredients.json'
+))
+SYNTHETIC_INGREDIENTS = 500
+TAGS = (
+    ('завтрак', 'breakfast', '#FF0000'),
+    ('обед', 'lunch', '#00FF00'),
+    ('ужин', 'dinner', '#0000FF'),
+    ('десерт', 'dessert', '#FF00FF'),
+    ('выпечка', 'baking', '#FFA500'),
+)
+DISHES = (
+    'суп', 'салат', 'пирог', 'запеканка', 'рагу', 'каша', 'омлет', 'паста',
+    'соус', 'оладьи', 'котлеты', 'плов', 'десерт', 'смузи', 'гратен',
+)
+STEPS = (
+    'Нарезать', 'Смешать', 'Обжарить', 'Отварить', 'Запечь', 'Добавить',
+    'Посолить', 'Взбить', 'Натереть', 'Потушить',
+)
+AMOUNTS = (1, 2, 3, 5, 10, 20, 50, 100, 150, 200, 250, 300, 500)
+
+
+class Zipf:
+    def __init__(self, population, rng, exponent=ZIPF_EXPONENT):
+        self.population = list(population)
+        rng.shuffle(self.population)
+        self.weights = list(itertools.accumulate(
+            1 / rank ** exponent
+            for rank in range(1, len(self.population) + 1)
+        ))
+        self.rng = rng
+
+    def sample(self, count):
+        count = min(count, len(self.population))
+        chosen = set()
+        while len(chosen) < count:
+            chosen.update(self.rng.choices(
+                self.population, cum_weights=self.weights,
+                k=count - len(chosen)
+            ))
+        return chosen
+
+
+def batched(objects, size):
+    iterator = iter(objects)
+    batch = list(itertools.islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(iterator, size))
+
+
+def bulk_insert(model, objects, batch_size):
+    for batch in batched(objects, batch_size):
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def _new_ids(model, start):
+    return list(model.objects.filter(id__gt=start).order_by('id').values_list(
+        'id', flat=True
+    ))
+
+
+def _last_id(model):
+    return model.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def _per_user(rng, mean):
+    return int(rng.expovariate(1 / mean)) if mean > 0 else 0
+
+
+def ensure_ingredients(path, batch_size):
+    if not Ingredient.objects.exists():
+        if path and os.path.exists(path):
+            Importer(batch_size).load(path)
+        else:
+            bulk_insert(Ingredient, (
+                Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+                for number in range(SYNTHETIC_INGREDIENTS)
+            ), batch_size)
+    return dict(Ingredient.objects.values_list('id', 'name'))
+
+
+def ensure_tags():
+    for name, slug, colour in TAGS:
+        Tag.objects.get_or_create(
+            slug=slug, defaults={'name': name, 'colour': colour}
+        )
+    return list(Tag.objects.values_list('id', flat=True))
+
+
+def generate_users(count, rng, password, batch_size):
+    start = _last_id(User)
+    password = make_password(password)
+    bulk_insert(User, (
+        User(
+            email=f'user{start + number}@example.com',
+            username=f'user{start + number}',
+            first_name=f'Имя{number}', last_name=f'Фамилия{number}',
+            password=password
+        )
+        for number in range(1, count + 1)
+    ), batch_size)
+    return _new_ids(User, start)
+
+
+def generate_recipes(count, rng, authors, ingredients, batch_size):
+    start = _last_id(Recipe)
+    names = list(ingredients.values())
+    bulk_insert(Recipe, (
+        Recipe(
+            author_id=authors.sample(1).pop(),
+            name=(
+                f'{rng.choice(DISHES)} «{rng.choice(names)}» '
+                f'{start + number}'
+            ),
+            text=' '.join(
+                f'{rng.choice(STEPS)} {rng.choice(names)}.'
+                for _ in range(rng.randint(3, 8))
+            ),
+            cooking_time=int(rng.triangular(5, 180, 30))
+        )
+        for number in range(1, count + 1)
+    ), batch_size)
+    return _new_ids(Recipe, start)
+
+
+def generate(users, recipes, seed=0, favorites=20, carts=5, subscriptions=10,
+             ingredients_path=INGREDIENTS, password='password',
+             batch_size=BATCH_SIZE):
+    rng = random.Random(seed)
+    ingredients = ensure_ingredients(ingredients_path, batch_size)
+    tag_ids = ensure_tags()
+    user_ids = generate_users(users, rng, password, batch_size)
+    authors = Zipf(user_ids, rng)
+    recipe_ids = generate_recipes(
+        recipes, rng, authors, ingredients, batch_size
+    )
+    popular_ingredients = Zipf(ingredients, rng)
+    bulk_insert(Amount, (
+        Amount(
+            recipe_id=recipe_id, ingredient_id=ingredient_id,
+            amount=rng.choice(AMOUNTS)
+        )
+        for recipe_id in recipe_ids
+        for ingredient_id in popular_ingredients.sample(
+            int(rng.triangular(2, 20, 7))
+        )
+    ), batch_size)
+    bulk_insert(Recipe.tags.through, (
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+        for recipe_id in recipe_ids
+        for tag_id in rng.sample(tag_ids, rng.randint(1, 3))
+    ), batch_size)
+    popular_recipes = Zipf(recipe_ids, rng)
+    for model, mean in ((Favorite, favorites), (ShoppingCart, carts)):
+        bulk_insert(model, (
+            model(user_id=user_id, recipe_id=recipe_id)
+            for user_id in user_ids
+            for recipe_id in popular_recipes.sample(_per_user(rng, mean))
+        ), batch_size)
+    bulk_insert(Subscription, (
+        Subscription(user_id=user_id, author_id=author_id)
+        for user_id in user_ids
+        for author_id in authors.sample(_per_user(rng, subscriptions))
+        if author_id != user_id
+    ), batch_size)
+    recount_counters()
+    for chunk in batched(recipe_ids, INDEX_CHUNK):
+        index_recipes(chunk)
+    return SimpleNamespace(
+        user_ids=user_ids,
+        recipe_ids=recipe_ids,
+        ingredient_ids=list(ingredients),
+        tag_ids=tag_ids,
+    )
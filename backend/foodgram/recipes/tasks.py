@@ -0,0 +1,31 @@
+import uuid
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from jobs.tasks import task
+from .exporters import EXPORTERS, shopping_list
+from .images import build_derivatives
+from .models import Recipe
+
+
+@task('recipes.build_image_derivatives')
+def build_image_derivatives(recipe_id):
+    recipe = Recipe.objects.filter(id=recipe_id).only('image').first()
+    if recipe is not None and recipe.image and build_derivatives(recipe.image):
+        Recipe.objects.filter(id=recipe_id, image=recipe.image.name).update(
+            derivatives_ready=True, updated=timezone.now()
+        )
+
+
+@task('recipes.export_shopping_list')
+def export_shopping_list(user_id, format):
+    content = ''.join(EXPORTERS[format](
+        shopping_list(user_id).iterator()
+    ))
+    name = default_storage.save(
+        f'exports/shopping_list_{uuid.uuid4().hex}.{format}',
+        ContentFile(content.encode())
+    )
+    return {'url': default_storage.url(name)}
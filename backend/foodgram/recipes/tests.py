@@ -0,0 +1,919 @@
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from calendar import timegm
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image, features
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import User
+from . import projections, response_cache
+from .filters import TAG_CHOICES_TTL
+from .fulltext import index_recipes, search_recipes
+from .ingredient_search import ingredient_index
+from .models import (
+    Amount, Favorite, Ingredient, Recipe, ShoppingCart, Subscription, Tag,
+)
+from .projection_check import (
+    check_projections, legacy_recipes, make_request,
+)
+from .query_plans import SCAN_PATTERNS, check_plans
+from .signals import schedule
+from .synthetic import generate
+from .tasks import build_image_derivatives
+from .toggles import link
+
+
+@skipUnless(connection.vendor in SCAN_PATTERNS, 'планы не поддерживаются')
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(10, 30, seed=1, ingredients_path=None)
+
+    def test_no_full_scans(self):
+        for name, plan, scans in check_plans():
+            with self.subTest(name):
+                self.assertEqual(scans, [], plan)
+
+
+class RecipeQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(10, 30, seed=1, ingredients_path=None)
+        cls.user = User.objects.filter(followings__isnull=False).first()
+        cls.recipe = Recipe.objects.order_by('id').first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_queries(self, count, path, params=None):
+        self.client.get(path, params)
+        with self.assertNumQueries(count):
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list(self):
+        for limit in (6, 30):
+            with self.subTest(limit=limit):
+                self.assert_queries(3, '/api/recipes/', {'limit': limit})
+
+    def test_list_cold_cache(self):
+        with self.assertNumQueries(6):
+            self.client.get('/api/recipes/', {'limit': 30})
+
+    def test_detail(self):
+        self.assert_queries(2, f'/api/recipes/{self.recipe.id}/')
+
+    def test_anonymous(self):
+        self.client.force_authenticate(None)
+        self.assert_queries(2, '/api/recipes/', {'limit': 6})
+        self.assert_queries(1, f'/api/recipes/{self.recipe.id}/')
+
+
+class ProjectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(10, 30, seed=1, ingredients_path=None)
+        cls.user = User.objects.filter(followers__isnull=False).first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def serialized(self, user, ids):
+        recipes = json.loads(JSONRenderer().render(
+            legacy_recipes(make_request(user), ids)
+        ))
+        return {recipe['id']: recipe for recipe in recipes}
+
+    def test_check_projections(self):
+        for user in (None, self.user):
+            for name, checked, mismatches in check_projections(user):
+                with self.subTest(user=user and user.id, name=name):
+                    self.assertEqual(mismatches, [])
+
+    def test_endpoints_match_serializers(self):
+        for user in (None, self.user):
+            self.client.force_authenticate(user)
+            with self.subTest(user=user and user.id):
+                recipes = self.client.get(
+                    '/api/recipes/', {'limit': 100}
+                ).json()['results']
+                serialized = self.serialized(
+                    user, [recipe['id'] for recipe in recipes]
+                )
+                self.assertEqual(len(recipes), Recipe.objects.count())
+                for recipe in recipes:
+                    self.assertEqual(recipe, serialized[recipe['id']])
+                    self.assertEqual(
+                        self.client.get(
+                            f'/api/recipes/{recipe["id"]}/'
+                        ).json(),
+                        serialized[recipe['id']]
+                    )
+
+
+@override_settings(MIDDLEWARE=[
+    'foodgram.middleware.ProfilingMiddleware', *settings.MIDDLEWARE
+])
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(10, 30, seed=1, ingredients_path=None)
+
+    def setUp(self):
+        cache.clear()
+
+    def timings(self, path):
+        response = self.client.get(path)
+        return {
+            name: float(duration.split('=', 1)[1])
+            for name, duration, *_ in (
+                entry.strip().split(';')
+                for entry in response['Server-Timing'].split(',')
+            )
+        }
+
+    def test_projection_phases(self):
+        timings = self.timings('/api/recipes/?limit=30')
+        self.assertEqual(
+            set(timings), {'total', 'view', 'render', 'serialize', 'db'}
+        )
+        self.assertGreater(timings['serialize'], 0)
+        self.assertLessEqual(
+            timings['serialize'] + timings['render'], timings['total']
+        )
+
+
+class ShoppingCartDownloadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(10, 30, seed=1, ingredients_path=None)
+        cls.user = User.objects.filter(carts__isnull=False).first()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_default_format_is_text(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/recipes/download_shopping_cart/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Type'], 'text/plain; charset=utf-8'
+        )
+        self.assertTrue(b''.join(response.streaming_content))
+
+    def test_errors_are_json(self):
+        for format in (None, 'txt', 'csv'):
+            with self.subTest(format=format):
+                response = self.client.get(
+                    '/api/recipes/download_shopping_cart/',
+                    {'format': format} if format else None
+                )
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertIn('detail', response.json())
+
+    def test_unknown_format_is_json(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(
+            '/api/recipes/download_shopping_cart/', {'format': 'pdf'}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(3, 3, seed=1, ingredients_path=None)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidate_reaches_cached_tags(self):
+        self.client.get('/api/tags/')
+        Tag.objects.bulk_create([Tag(name='новый', slug='new')])
+        response_cache.invalidate(Tag)
+        response = self.client.get('/api/tags/')
+        self.assertIn('new', [tag['slug'] for tag in response.json()])
+
+    def test_invalidate_reaches_ingredient_index(self):
+        params = {'name': 'шафран'}
+        response = self.client.get('/api/ingredients/', params)
+        self.assertEqual(response.json(), [])
+        Ingredient.objects.bulk_create([
+            Ingredient(name='шафран', measurement_unit='г')
+        ])
+        response_cache.invalidate(Ingredient)
+        response = self.client.get('/api/ingredients/', params)
+        self.assertEqual(
+            [ingredient['name'] for ingredient in response.json()],
+            ['шафран']
+        )
+
+    def test_invalid_token_is_rejected_from_cache(self):
+        self.assertEqual(self.client.get('/api/tags/').status_code, 200)
+        response = self.client.get(
+            '/api/tags/', HTTP_AUTHORIZATION='Token invalid'
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_last_modified_follows_data(self):
+        tag = Tag.objects.order_by('id').first()
+        Tag.objects.update(updated=timezone.now() - timedelta(days=1))
+        response_cache.invalidate(Tag)
+        latest = Tag.objects.aggregate(updated=Max('updated'))['updated']
+        for path in ('/api/tags/', f'/api/tags/{tag.id}/'):
+            with self.subTest(path):
+                response = self.client.get(path)
+                self.assertEqual(
+                    response['Last-Modified'],
+                    http_date(timegm(latest.utctimetuple()))
+                )
+                self.assertEqual(self.client.get(
+                    path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                ).status_code, 304)
+
+    def test_name_search_is_not_cached(self):
+        response = self.client.get('/api/ingredients/')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertFalse(self.client.get(
+            '/api/ingredients/', {'name': 'ингредиент'}
+        ).has_header('ETag'))
+
+
+class ConditionalGetTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        generate(3, 6, seed=1, ingredients_path=None)
+        self.recipe = Recipe.objects.order_by('id').first()
+        self.path = f'/api/recipes/{self.recipe.id}/'
+
+    def test_validators(self):
+        response = self.client.get('/api/recipes/', {'limit': 3})
+        self.assertTrue(response.has_header('ETag'))
+        response = self.client.get(self.path)
+        self.assertTrue(response.has_header('ETag'))
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(timegm(self.recipe.updated.utctimetuple()))
+        )
+
+    def test_not_modified(self):
+        for path in ('/api/recipes/?limit=3', self.path):
+            with self.subTest(path):
+                etag = self.client.get(path)['ETag']
+                self.assertEqual(self.client.get(
+                    path, HTTP_IF_NONE_MATCH=etag
+                ).status_code, 304)
+        last_modified = self.client.get(self.path)['Last-Modified']
+        self.assertEqual(self.client.get(
+            self.path, HTTP_IF_MODIFIED_SINCE=last_modified
+        ).status_code, 304)
+
+    def assert_changes_etag(self, change):
+        etag = self.client.get(self.path)['ETag']
+        with transaction.atomic():
+            change()
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_amount_change(self):
+        amount = Amount.objects.filter(recipe=self.recipe).first()
+        amount.amount += 1
+        self.assert_changes_etag(amount.save)
+
+    def test_tag_change(self):
+        tag = Tag.objects.first()
+        self.recipe.tags.add(tag)
+        tag.name = 'переименован'
+        self.assert_changes_etag(tag.save)
+        self.assert_changes_etag(lambda: self.recipe.tags.remove(tag))
+
+    def test_ordering_by_updated(self):
+        Recipe.objects.update(updated=timezone.now() - timedelta(days=1))
+        Recipe.objects.filter(id=self.recipe.id).touch()
+        ids = list(Recipe.objects.order_by('-id').values_list('id', flat=True))
+        ids.remove(self.recipe.id)
+        for ordering, expected in (('-updated', [self.recipe.id, *ids]),
+                                   ('updated', [*ids[::-1], self.recipe.id])):
+            for pagination in ('page', 'cursor'):
+                with self.subTest(ordering=ordering, pagination=pagination):
+                    response = self.client.get('/api/recipes/', {
+                        'ordering': ordering, 'pagination': pagination,
+                        'limit': 100,
+                    })
+                    results = response.json()['results']
+                    self.assertEqual(
+                        [recipe['id'] for recipe in results], expected
+                    )
+
+
+class RecipeFragmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(3, 3, seed=1, ingredients_path=None)
+        cls.recipe = Recipe.objects.order_by('id').first()
+        cls.tag = Tag.objects.create(name='новый', slug='new')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_update_between_reads(self):
+        recipe_tags = projections.recipe_tags
+
+        def read_then_update(recipe_ids):
+            tags = recipe_tags(recipe_ids)
+            self.recipe.tags.add(self.tag)
+            Recipe.objects.filter(id=self.recipe.id).touch()
+            return tags
+
+        path = f'/api/recipes/{self.recipe.id}/'
+        with mock.patch.object(projections, 'recipe_tags', read_then_update):
+            self.client.get(path)
+        tags = self.client.get(path).json()['tags']
+        self.assertIn('new', [tag['slug'] for tag in tags])
+
+    def test_non_numeric_id(self):
+        response = self.client.get('/api/recipes/abc/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ScheduleTests(TransactionTestCase):
+    def setUp(self):
+        self.calls = []
+
+    def record(self, ids):
+        self.calls.append(ids)
+
+    def test_merges_ids_until_commit(self):
+        with transaction.atomic():
+            schedule(self.record, [1])
+            schedule(self.record, [2, 3])
+            self.assertEqual(self.calls, [])
+        self.assertEqual(self.calls, [{1, 2, 3}])
+
+    def test_runs_at_once_outside_transaction(self):
+        schedule(self.record, [1])
+        self.assertEqual(self.calls, [{1}])
+
+    def test_drops_ids_of_rolled_back_savepoint(self):
+        with transaction.atomic():
+            schedule(self.record, [1])
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    schedule(self.record, [2])
+                    raise RuntimeError
+            schedule(self.record, [3])
+        self.assertEqual(self.calls, [{1, 3}])
+
+    def test_forgets_rolled_back_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                schedule(self.record, [1])
+                raise RuntimeError
+        with transaction.atomic():
+            schedule(self.record, [2])
+        self.assertEqual(self.calls, [{2}])
+
+
+class CounterFixtureTests(TestCase):
+    def test_loaddata_keeps_dumped_counters(self):
+        fixture = [
+            {'model': 'users.user', 'pk': 1, 'fields': {
+                'email': 'author@example.com', 'username': 'author',
+                'first_name': 'a', 'last_name': 'a', 'password': '',
+                'recipes_count': 1, 'followers_count': 1,
+            }},
+            {'model': 'users.user', 'pk': 2, 'fields': {
+                'email': 'reader@example.com', 'username': 'reader',
+                'first_name': 'r', 'last_name': 'r', 'password': '',
+            }},
+            {'model': 'recipes.recipe', 'pk': 1, 'fields': {
+                'author': 1, 'name': 'рецепт', 'text': 'текст',
+                'cooking_time': 5, 'favorites_count': 1, 'carts_count': 1,
+            }},
+            {'model': 'recipes.favorite', 'pk': 1, 'fields': {
+                'user': 2, 'recipe': 1,
+            }},
+            {'model': 'recipes.shoppingcart', 'pk': 1, 'fields': {
+                'user': 2, 'recipe': 1,
+            }},
+            {'model': 'recipes.subscription', 'pk': 1, 'fields': {
+                'user': 2, 'author': 1,
+            }},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.json')
+            with open(path, 'w', encoding='utf-8') as dump:
+                json.dump(fixture, dump)
+            call_command('loaddata', path, verbosity=0)
+        recipe = Recipe.objects.get(pk=1)
+        author = User.objects.get(pk=1)
+        self.assertEqual(
+            (recipe.favorites_count, recipe.carts_count), (1, 1)
+        )
+        self.assertEqual(
+            (author.recipes_count, author.followers_count), (1, 1)
+        )
+
+
+class ImportDataTests(TestCase):
+    models = (User, Tag, Ingredient, Recipe, Amount, Favorite, ShoppingCart,
+              Subscription, Recipe.tags.through)
+
+    def snapshot(self):
+        return (
+            {model: model.objects.count() for model in self.models},
+            list(Recipe.objects.order_by('name').values_list(
+                'name', 'favorites_count', 'carts_count'
+            )),
+            list(User.objects.order_by('email').values_list(
+                'email', 'recipes_count', 'followers_count'
+            )),
+        )
+
+    def test_second_run_changes_nothing(self):
+        generate(5, 12, seed=1, ingredients_path=None)
+        with tempfile.TemporaryDirectory() as directory:
+            dump = os.path.join(directory, 'dump.json')
+            call_command(
+                'dumpdata', 'users.user', 'recipes', output=dump, verbosity=0
+            )
+            ingredients = os.path.join(directory, 'ingredients.csv')
+            with open(ingredients, 'w', encoding='utf-8') as stream:
+                stream.write('шафран,г\nшафран,г\n')
+            expected = self.snapshot()
+            for model in (User, Tag, Ingredient):
+                model.objects.all().delete()
+            outputs = []
+            for _ in range(2):
+                output = StringIO()
+                call_command('import_data', dump, ingredients, stdout=output)
+                outputs.append(output.getvalue())
+                snapshot = self.snapshot()
+                with self.subTest(run=len(outputs)):
+                    self.assertEqual(snapshot[1:], expected[1:])
+                    self.assertEqual(snapshot[0], {
+                        **expected[0],
+                        Ingredient: expected[0][Ingredient] + 1,
+                    })
+        self.assertIn(': +', outputs[0])
+        self.assertNotIn(': +', outputs[1])
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), (200, 100, 50)).save(buffer, 'JPEG')
+        self.recipe = Recipe(
+            author=User.objects.create(
+                email='author@example.com', username='author'
+            ),
+            name='рецепт', text='текст', cooking_time=5
+        )
+        self.recipe.image.save('dish.jpg', ContentFile(buffer.getvalue()))
+
+    def images(self):
+        recipe = self.client.get(f'/api/recipes/{self.recipe.id}/').json()
+        return recipe['image'], recipe['images']
+
+    def test_original_until_derivatives_are_built(self):
+        image, images = self.images()
+        self.assertEqual(set(images.values()), {image})
+        build_image_derivatives(self.recipe.id)
+        image, images = self.images()
+        self.assertNotIn(image, images.values())
+        for url in images.values():
+            name = url.split(settings.MEDIA_URL, 1)[1]
+            self.assertTrue(self.recipe.image.storage.exists(name), url)
+
+    def test_sizes_follow_supported_formats(self):
+        sizes = {'thumbnail', 'detail'}
+        if features.check('webp'):
+            sizes |= {'thumbnail_webp', 'detail_webp'}
+        build_image_derivatives(self.recipe.id)
+        self.assertEqual(set(self.images()[1]), sizes)
+        self.recipe.refresh_from_db()
+        self.assertTrue(self.recipe.derivatives_ready)
+
+
+class RecipeFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(10, 30, seed=1, ingredients_path=None)
+        cls.user = User.objects.filter(
+            favorites__isnull=False, carts__isnull=False
+        ).first()
+        cls.author = User.objects.order_by('-recipes_count').first()
+        cls.slugs = list(Tag.objects.values_list('slug', flat=True)[:2])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def expected(self, user, tags, author, flags):
+        marked = {'is_favorited': set(), 'is_in_shopping_cart': set()}
+        if user is not None:
+            for name, model in (('is_favorited', Favorite),
+                                ('is_in_shopping_cart', ShoppingCart)):
+                marked[name] = set(model.objects.filter(
+                    user=user
+                ).values_list('recipe_id', flat=True))
+        return [
+            recipe.id
+            for recipe in Recipe.objects.order_by('-id').prefetch_related(
+                'tags'
+            )
+            if (not tags or {tag.slug for tag in recipe.tags.all()} & tags)
+            and (author is None or recipe.author_id == author.id)
+            and all(
+                (recipe.id in marked[name]) == value
+                for name, value in flags.items()
+            )
+        ]
+
+    def test_combinations(self):
+        for user, tags, author, favorited, in_cart in itertools.product(
+            (None, self.user), ([], self.slugs[:1], self.slugs),
+            (None, self.author), (None, True, False), (None, True, False)
+        ):
+            flags = {
+                name: value
+                for name, value in (('is_favorited', favorited),
+                                    ('is_in_shopping_cart', in_cart))
+                if value is not None
+            }
+            params = {'limit': 100, 'tags': tags, **{
+                name: int(value) for name, value in flags.items()
+            }}
+            if author is not None:
+                params['author'] = author.id
+            with self.subTest(user=user and user.id, params=params):
+                self.client.force_authenticate(user)
+                response = self.client.get('/api/recipes/', params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [recipe['id'] for recipe in response.json()['results']],
+                    self.expected(user, set(tags), author, flags)
+                )
+
+    def test_user_has_marked_recipes(self):
+        self.assertTrue(self.expected(
+            self.user, set(), None,
+            {'is_favorited': True, 'is_in_shopping_cart': True}
+        ))
+
+    def test_unknown_tag(self):
+        response = self.client.get('/api/recipes/', {'tags': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_new_tag_after_invalidation(self):
+        self.client.get('/api/recipes/', {'tags': self.slugs[0]})
+        Tag.objects.bulk_create([Tag(name='новый', slug='new')])
+        response_cache.invalidate(Tag)
+        response = self.client.get('/api/recipes/', {'tags': 'new'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_tag_after_ttl(self):
+        self.client.get('/api/recipes/', {'tags': self.slugs[0]})
+        Tag.objects.bulk_create([Tag(name='новый', slug='new')])
+        later = time.monotonic() + TAG_CHOICES_TTL + 1
+        with mock.patch('recipes.filters.time.monotonic', return_value=later):
+            response = self.client.get('/api/recipes/', {'tags': 'new'})
+        self.assertEqual(response.status_code, 200)
+
+
+class IngredientSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit='г')
+            for name in (
+                'молоко', 'молоко 3,2%', 'кокосовое молоко', 'сухое молоко',
+                'молочный шоколад', 'мука', 'картофель', 'малина',
+            )
+        ])
+
+    def setUp(self):
+        cache.clear()
+        response_cache.invalidate(Ingredient)
+
+    def names(self, query):
+        return [item['name'] for item in ingredient_index.search(query)]
+
+    def test_prefix_then_substring_then_fuzzy(self):
+        self.assertEqual(self.names('молоко'), [
+            'молоко', 'молоко 3,2%', 'сухое молоко', 'кокосовое молоко',
+            'молочный шоколад',
+        ])
+
+    def test_typos(self):
+        for query, name in (('малако', 'молоко'), ('кортофель', 'картофель'),
+                            ('муко', 'мука')):
+            with self.subTest(query):
+                self.assertEqual(self.names(query)[0], name)
+
+    def test_too_many_edits(self):
+        self.assertEqual(self.names('мак'), ['мука', 'малина'])
+        self.assertEqual(self.names('шпинат'), [])
+        self.assertNotIn('малина', self.names('малако'))
+
+
+class FullTextSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(email='cook@example.com', username='cook')
+        pumpkin, rice = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('тыква', 'рис')
+        )
+        fields = (
+            ('тыква печёная', 'Запечь в духовке.', rice),
+            ('каша', 'Сварить на молоке.', pumpkin),
+            ('суп', 'Добавить тыква по вкусу.', rice),
+            ('плов', 'Обжарить и потушить.', rice),
+        )
+        cls.recipes = []
+        for name, text, ingredient in fields:
+            recipe = Recipe.objects.create(
+                author=author, name=name, text=text, cooking_time=10
+            )
+            Amount.objects.create(recipe=recipe, ingredient=ingredient)
+            cls.recipes.append(recipe)
+        index_recipes()
+
+    def test_name_above_ingredients_above_text(self):
+        self.assertEqual(
+            list(search_recipes(
+                Recipe.objects.all(), 'тыква'
+            ).values_list('id', flat=True)),
+            [recipe.id for recipe in self.recipes[:3]]
+        )
+
+    def test_endpoint_keeps_rank_order(self):
+        response = self.client.get(
+            '/api/recipes/', {'search': 'тыкв', 'limit': 10}
+        )
+        self.assertEqual(
+            [recipe['id'] for recipe in response.json()['results']],
+            [recipe.id for recipe in self.recipes[:3]]
+        )
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(3, 11, seed=1, ingredients_path=None)
+        Recipe.objects.update(updated=timezone.now() - timedelta(days=1))
+
+    def setUp(self):
+        cache.clear()
+
+    def pages(self, params, link='next'):
+        pages = []
+        response = self.client.get('/api/recipes/', {
+            'pagination': 'cursor', 'limit': 3, **params
+        })
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append([recipe['id'] for recipe in data['results']])
+            if data[link] is None:
+                return pages, data
+            response = self.client.get(data[link])
+
+    def test_pages_with_equal_sort_keys(self):
+        for ordering, expected in (
+            ({}, Recipe.objects.order_by('-id')),
+            ({'ordering': '-updated'}, Recipe.objects.order_by('-id')),
+            ({'ordering': 'updated'}, Recipe.objects.order_by('id')),
+        ):
+            expected = list(expected.values_list('id', flat=True))
+            with self.subTest(**ordering):
+                pages, last = self.pages(ordering)
+                self.assertEqual(
+                    [len(page) for page in pages], [3, 3, 3, 2]
+                )
+                self.assertEqual(sum(pages, []), expected)
+                self.assertIsNotNone(last['previous'])
+                back, first = self.pages(
+                    {**ordering, 'cursor': parse_qs(
+                        urlparse(last['previous']).query
+                    )['cursor'][0]},
+                    link='previous'
+                )
+                self.assertEqual(sum(back[::-1], []), expected[:9])
+                self.assertIsNotNone(first['next'])
+                middle = self.client.get(first['next']).json()
+                self.assertEqual(
+                    [recipe['id'] for recipe in self.client.get(
+                        self.client.get(middle['next']).json()['previous']
+                    ).json()['results']],
+                    [recipe['id'] for recipe in middle['results']]
+                )
+
+    def test_first_page_links(self):
+        data = self.client.get('/api/recipes/', {
+            'pagination': 'cursor', 'limit': 3
+        }).json()
+        self.assertIsNone(data['previous'])
+        query = parse_qs(urlparse(data['next']).query)
+        self.assertEqual(
+            (query['pagination'], query['limit']), (['cursor'], ['3'])
+        )
+        self.assertIn('cursor', query)
+        self.assertNotIn('count', data)
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', 'cD1bIngiXQ==', 'cD1bIngiLCAiMSJd'):
+            with self.subTest(cursor):
+                response = self.client.get('/api/recipes/', {
+                    'pagination': 'cursor', 'cursor': cursor,
+                    'ordering': '-updated',
+                })
+                self.assertEqual(response.status_code, 404)
+
+    def test_estimated_count(self):
+        data = self.client.get('/api/recipes/', {
+            'pagination': 'cursor', 'count': 'estimate'
+        }).json()
+        self.assertEqual(data['count'], 11)
+
+
+class LinkCounterTests(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create(
+            email='author@example.com', username='author'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='рецепт', text='текст', cooking_time=5
+        )
+        self.reader = User.objects.create(
+            email='reader@example.com', username='reader'
+        )
+        link(Favorite(user=self.reader, recipe=self.recipe))
+        link(Subscription(user=self.reader, author=self.author))
+
+    def assert_counters(self, favorites, followers):
+        self.recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual(
+            (self.recipe.favorites_count, self.author.followers_count),
+            (favorites, followers)
+        )
+
+    def test_user_deletion(self):
+        self.assert_counters(1, 1)
+        self.reader.delete()
+        self.assert_counters(0, 0)
+
+    def test_admin_deletion(self):
+        admin = User.objects.create_superuser(
+            email='admin@example.com', username='admin', password='admin'
+        )
+        self.client.force_login(admin)
+        favorite = Favorite.objects.get()
+        self.client.post(
+            f'/admin/recipes/favorite/{favorite.id}/delete/', {'post': 'yes'}
+        )
+        self.client.post('/admin/recipes/subscription/', {
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': Subscription.objects.values_list(
+                'id', flat=True
+            ),
+        })
+        self.assertFalse(Favorite.objects.exists())
+        self.assertFalse(Subscription.objects.exists())
+        self.assert_counters(0, 0)
+
+
+class ToggleConcurrencyTests(TransactionTestCase):
+    users = 6
+    rounds = 5
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('нужна тестовая база в файле (TEST_DB_NAME)')
+        self.author = User.objects.create(
+            email='author@example.com', username='author'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='рецепт', text='текст', cooking_time=5
+        )
+        self.readers = [
+            User.objects.create(
+                email=f'reader{index}@example.com', username=f'reader{index}'
+            )
+            for index in range(self.users)
+        ]
+
+    def hammer(self, add, remove):
+        workers = 2 * len(self.readers)
+        barrier = threading.Barrier(workers)
+
+        def run(index):
+            client = APIClient()
+            client.force_authenticate(self.readers[index // 2])
+            try:
+                statuses = []
+                for _ in range(self.rounds):
+                    statuses.append(add(client).status_code)
+                    statuses.append(remove(client).status_code)
+                barrier.wait()
+                if index // 2 % 2:
+                    statuses.append(add(client).status_code)
+                return statuses
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(workers) as executor:
+            statuses = set(itertools.chain.from_iterable(
+                executor.map(run, range(workers))
+            ))
+        self.assertLessEqual(statuses, {200, 201, 204})
+        return len(self.readers) // 2
+
+    def hammer_path(self, path):
+        return self.hammer(
+            lambda client: client.get(path),
+            lambda client: client.delete(path)
+        )
+
+    def test_batch(self):
+        recipes = [self.recipe] + [
+            Recipe.objects.create(
+                author=self.author, name=f'рецепт {index}', text='текст',
+                cooking_time=5
+            )
+            for index in range(2)
+        ]
+        ids = {'ids': [recipe.id for recipe in recipes]}
+        for model, path, counter in (
+            (Favorite, '/api/recipes/favorite/', 'favorites_count'),
+            (ShoppingCart, '/api/recipes/shopping_cart/', 'carts_count'),
+        ):
+            with self.subTest(path):
+                expected = self.hammer(
+                    lambda client: client.post(path, ids, format='json'),
+                    lambda client: client.delete(path, ids, format='json')
+                )
+                for recipe in recipes:
+                    recipe.refresh_from_db()
+                    self.assertEqual(
+                        model.objects.filter(recipe=recipe).count(), expected
+                    )
+                    self.assertEqual(getattr(recipe, counter), expected)
+
+    def test_favorite(self):
+        expected = self.hammer_path(
+            f'/api/recipes/{self.recipe.id}/favorite/'
+        )
+        self.recipe.refresh_from_db()
+        self.assertEqual(Favorite.objects.count(), expected)
+        self.assertEqual(self.recipe.favorites_count, expected)
+
+    def test_shopping_cart(self):
+        expected = self.hammer_path(
+            f'/api/recipes/{self.recipe.id}/shopping_cart/'
+        )
+        self.recipe.refresh_from_db()
+        self.assertEqual(ShoppingCart.objects.count(), expected)
+        self.assertEqual(self.recipe.carts_count, expected)
+
+    def test_subscribe(self):
+        expected = self.hammer_path(
+            f'/api/users/{self.author.id}/subscribe/'
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(Subscription.objects.count(), expected)
+        self.assertEqual(self.author.followers_count, expected)
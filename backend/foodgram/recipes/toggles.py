@@ -0,0 +1,42 @@
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import NotFound
+
+from users.models import User
+from .counters import change_counter, recount_counter
+from .models import Favorite, Recipe, ShoppingCart, Subscription
+
+COUNTERS = {
+    Favorite: ('recipe', Recipe, 'favorites_count'),
+    ShoppingCart: ('recipe', Recipe, 'carts_count'),
+    Subscription: ('author', User, 'followers_count'),
+}
+
+
+def link(obj):
+    model = type(obj)
+    field, parent, counter = COUNTERS[model]
+    pk = getattr(obj, f'{field}_id')
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create([obj])
+            change_counter(parent, pk, counter, 1)
+    except IntegrityError:
+        if not parent.objects.filter(pk=pk).exists():
+            raise NotFound()
+        return False
+    return True
+
+
+def unlink(model, **lookup):
+    field, parent, counter = COUNTERS[model]
+    with transaction.atomic():
+        deleted, _ = model.objects.filter(**lookup).delete()
+        if deleted:
+            change_counter(parent, lookup[f'{field}_id'], counter, -deleted)
+    return deleted > 0
+
+
+def recount_links(model, ids):
+    field, parent, counter = COUNTERS[model]
+    with transaction.atomic(savepoint=False):
+        recount_counter(parent, ids, counter, model, field)
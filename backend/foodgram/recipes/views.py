@@ -1,70 +1,214 @@
+from calendar import timegm
 from http import HTTPStatus
 
-from django.http import StreamingHttpResponse
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import viewsets
 from rest_framework.decorators import action, api_view
+from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import (
     IsAuthenticated, IsAuthenticatedOrReadOnly,
 )
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from .filters import IngredientFilter, RecipeFilter
-from .models import Amount, Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from jobs.tasks import enqueue
+from .exporters import EXPORTERS, shopping_list
+from .filters import (
+    FullTextSearchFilter, IngredientFilter, RecipeFilter, RecipeOrderingFilter,
+)
+from .ingredient_search import ingredient_index
+from .models import (
+    Favorite, Ingredient, Recipe, ShoppingCart, Subscription, Tag,
+)
 from .paginators import RecipePagination
 from .permissions import IsAuthorPermission
+from .projections import (
+    INGREDIENT_FIELDS, RECIPE_FIELDS, project_recipes, recipes_etag,
+)
+from .renderers import CSVRenderer, PlainTextRenderer
 from .serializers import (
-    FavoriteSerializer, IngredientSerializer, RecipeCreateSerializer,
-    RecipeSerializer, ShoppingCartSerializer, ShortRecipeSerializer,
-    TagSerializer,
+    IngredientSerializer, RecipeCreateSerializer, RecipeIdsSerializer,
+    RecipeSerializer, ShortRecipeSerializer, TagSerializer,
 )
+from .toggles import link, recount_links, unlink
 from .viewsets import CustomViewSet
 
 
+def toggle_recipes(request, model):
+    serializer = RecipeIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = serializer.validated_data['ids']
+    user = request.user
+    present = dict(Recipe.objects.filter(id__in=ids).annotate(
+        present=Exists(model.objects.filter(user=user, recipe=OuterRef('pk')))
+    ).values_list('id', 'present'))
+    if request.method == 'POST':
+        changed = [pk for pk in ids if present.get(pk) is False]
+        done, kept = 'added', 'exists'
+    else:
+        changed = [pk for pk in ids if present.get(pk)]
+        done, kept = 'removed', 'missing'
+    if changed:
+        with transaction.atomic():
+            if request.method == 'POST':
+                model.objects.bulk_create(
+                    [model(user=user, recipe_id=pk) for pk in changed],
+                    ignore_conflicts=True
+                )
+            else:
+                model.objects.filter(
+                    user=user, recipe_id__in=changed
+                ).delete()
+            recount_links(model, changed)
+    changed = set(changed)
+    return Response({'results': [
+        {
+            'id': pk,
+            'status': (
+                'not_found' if pk not in present
+                else done if pk in changed else kept
+            ),
+        }
+        for pk in ids
+    ]})
+
+
+def with_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     pagination_class = RecipePagination
     lookup_field = 'id'
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorPermission]
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [
+        RecipeOrderingFilter, FullTextSearchFilter, DjangoFilterBackend,
+    ]
     filterset_class = RecipeFilter
     filterset_fields = [
         'page', 'author', 'tags', 'is_favorited', 'is_in_shopping_cart'
     ]
-    search_fields = ['^name']
+
+    def get_queryset(self):
+        return Recipe.objects.with_user_flags(self.request.user)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        user = self.request.user
+        if self.action in ['list', 'retrieve']:
+            context['subscriptions'] = set()
+            if user.is_authenticated:
+                context['subscriptions'] = set(
+                    Subscription.objects.filter(
+                        user=user
+                    ).values_list('author__id', flat=True)
+                )
+        return context
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return RecipeCreateSerializer
         return RecipeSerializer
 
-    @action(detail=False, methods=['get'],
-            permission_classes=[IsAuthenticated])
-    def download_shopping_cart(self, request):
-        res_queryset = {}
-        queryset = Amount.objects.filter(
-            recipe__carts__user__id=request.user.id
-        ).values_list(
-            'ingredient__name', 'ingredient__measurement_unit',
-            'amount', named=True
+    def handle_exception(self, exc):
+        if self.action == 'download_shopping_cart':
+            self.request.accepted_renderer = JSONRenderer()
+            self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
+    def retrieve(self, request, *args, **kwargs):
+        row = get_object_or_404(
+            self.filter_queryset(self.get_queryset()).values(*RECIPE_FIELDS),
+            id=kwargs[self.lookup_field]
+        )
+        subscriptions = self.get_serializer_context()['subscriptions']
+        etag = recipes_etag(
+            [row], subscriptions, request.build_absolute_uri(),
+            request.accepted_media_type
         )
-        for amount in queryset:
-            name = (
-                amount.ingredient__name, amount.ingredient__measurement_unit
+        last_modified = None
+        if not request.user.is_authenticated:
+            last_modified = timegm(row['updated'].utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(
+                project_recipes([row], request, subscriptions)[0]
             )
-            if name in res_queryset:
-                res_queryset[name] += amount.amount
+        return with_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *RECIPE_FIELDS
+        )
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        subscriptions = self.get_serializer_context()['subscriptions']
+        etag = recipes_etag(
+            rows, subscriptions, request.build_absolute_uri(),
+            request.accepted_media_type,
+            None if page is None else self.get_paginated_response([]).data
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data = project_recipes(rows, request, subscriptions)
+            if page is None:
+                response = Response(data)
             else:
-                res_queryset[name] = amount.amount
-        rows = ([ingredient[0], str(res_queryset[ingredient]),
-                 ingredient[1], '\n']
-                for ingredient in res_queryset)
-        inputs = (', '.join(row) for row in rows)
-
-        response = StreamingHttpResponse(inputs, content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="recipes.txt"'
+                response = self.get_paginated_response(data)
+        return with_validators(response, etag)
+
+    @action(detail=False, methods=['post', 'delete'], url_path='favorite',
+            permission_classes=[IsAuthenticated])
+    def favorite_batch(self, request):
+        return toggle_recipes(request, Favorite)
+
+    @action(detail=False, methods=['post', 'delete'],
+            url_path='shopping_cart', permission_classes=[IsAuthenticated])
+    def shopping_cart_batch(self, request):
+        return toggle_recipes(request, ShoppingCart)
+
+    @action(detail=False, methods=['get'],
+            permission_classes=[IsAuthenticated],
+            renderer_classes=[PlainTextRenderer, CSVRenderer, JSONRenderer])
+    def download_shopping_cart(self, request):
+        renderer = request.accepted_renderer
+        if request.query_params.get('async') in ('1', 'true'):
+            job = enqueue(
+                'recipes.export_shopping_list', user=request.user,
+                user_id=request.user.id, format=renderer.format
+            )
+            return JsonResponse(
+                {
+                    'id': job.id,
+                    'status': job.status,
+                    'url': request.build_absolute_uri(
+                        reverse('job-detail', kwargs={'id': job.id})
+                    ),
+                },
+                status=HTTPStatus.ACCEPTED
+            )
+        rows = shopping_list(request.user).iterator()
+        response = StreamingHttpResponse(
+            EXPORTERS[renderer.format](rows),
+            content_type=f'{renderer.media_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{renderer.format}"'
+        )
         return response
 
 
@@ -84,46 +228,47 @@ class IngredientViewSet(CustomViewSet):
     filterset_fields = ['name']
     lookup_field = 'id'
     serializer_class = IngredientSerializer
+    uncached_params = ('name',)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            self.list_ingredients, request, *args, **kwargs
+        )
+
+    def list_ingredients(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            queryset = self.filter_queryset(self.get_queryset()).values(
+                *INGREDIENT_FIELDS
+            )
+            page = self.paginate_queryset(queryset)
+            if page is None:
+                return Response(list(queryset))
+            return self.get_paginated_response(page)
+        limit = request.query_params.get('limit', '')
+        if limit.isdigit():
+            return Response(ingredient_index.search(name, int(limit)))
+        return Response(ingredient_index.search(name))
+
+
+def toggle_recipe(request, recipe_id, model):
+    if request.method == 'GET':
+        recipe = get_object_or_404(Recipe, id=recipe_id)
+        created = link(model(user=request.user, recipe=recipe))
+        return Response(
+            ShortRecipeSerializer(recipe).data,
+            status=HTTPStatus.CREATED if created else HTTPStatus.OK
+        )
+    if not unlink(model, user=request.user, recipe_id=recipe_id):
+        get_object_or_404(Recipe, id=recipe_id)
+    return Response(status=HTTPStatus.NO_CONTENT)
 
 
 @api_view(['get', 'delete'],)
 def cart_view(request, recipe_id):
-    user = request.user
-    recipe = get_object_or_404(
-        Recipe, id=recipe_id
-    )
-    if request.method == 'GET':
-        data = {'user': user.id, 'recipe': recipe.id}
-        serializer = ShoppingCartSerializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        res_serializer = ShortRecipeSerializer(recipe)
-        return Response(res_serializer.data, status=HTTPStatus.CREATED)
-    elif request.method == 'DELETE':
-        instance = get_object_or_404(ShoppingCart, user=user, recipe=recipe)
-        instance.delete()
-        return Response(status=HTTPStatus.NO_CONTENT)
+    return toggle_recipe(request, recipe_id, ShoppingCart)
 
 
 @api_view(['get', 'delete'],)
 def favorite_view(request, recipe_id):
-    user = request.user
-    recipe = get_object_or_404(
-        Recipe, id=recipe_id
-    )
-    if request.method == 'GET':
-        data = {'user': user.id, 'recipe': recipe_id}
-        serializer = FavoriteSerializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        res_serializer = ShortRecipeSerializer(recipe)
-        return Response(res_serializer.data, status=HTTPStatus.CREATED)
-    elif request.method == 'DELETE':
-        try:
-            instance = get_object_or_404(Favorite, user=user, recipe=recipe)
-            instance.delete()
-            return Response(status=HTTPStatus.NO_CONTENT)
-        except Exception:
-            return Response(
-                'не в ваших избранных', status=HTTPStatus.BAD_REQUEST
-            )
+    return toggle_recipe(request, recipe_id, Favorite)
@@ -1,7 +1,48 @@
+from calendar import timegm
+
+from django.core.cache import cache
+from django.db.models import Max
 from rest_framework import mixins, viewsets
 
+from . import response_cache
+
 
 class CustomViewSet(mixins.RetrieveModelMixin,
                     mixins.ListModelMixin,
                     viewsets.GenericViewSet):
-    pass
+    uncached_params = ()
+
+    def last_modified(self):
+        updated = self.queryset.model.objects.aggregate(
+            updated=Max('updated')
+        )['updated']
+        return None if updated is None else timegm(updated.utctimetuple())
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if any(
+            param in request.query_params for param in self.uncached_params
+        ) or not request.accepted_media_type.startswith('application/json'):
+            return handler(request, *args, **kwargs)
+        model = self.queryset.model
+        version = response_cache.model_version(model)
+        key = response_cache.response_key(model, version, request)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response = self.finalize_response(
+                request, response, *args, **kwargs
+            )
+            entry = response_cache.store(
+                key, response.render(), self.last_modified()
+            )
+        return response_cache.build_response(request, entry)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,80 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+
+def token_digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _cache_key(digest):
+    return f'auth-token:{digest}'
+
+
+class LocalCache:
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_tokens = LocalCache(
+    settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_LOCAL_TTL
+)
+
+
+def invalidate_token(key):
+    digest = token_digest(key)
+    local_tokens.delete(digest)
+    cache.delete(_cache_key(digest))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        if not settings.TOKEN_CACHE_TTL:
+            return super().authenticate_credentials(key)
+        digest = token_digest(key)
+        credentials = local_tokens.get(digest)
+        if credentials is None:
+            credentials = cache.get(_cache_key(digest))
+            if credentials is None:
+                credentials = super().authenticate_credentials(key)
+                cache.set(
+                    _cache_key(digest), credentials, settings.TOKEN_CACHE_TTL
+                )
+            local_tokens.set(digest, credentials)
+        user, token = credentials
+        return copy.copy(user), token
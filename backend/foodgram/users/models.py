@@ -37,6 +37,10 @@ class User(AbstractBaseUser):
                                 verbose_name='username')
     password = models.CharField(max_length=150, verbose_name='password',
                                 blank=True)
+    recipes_count = models.IntegerField(default=0, editable=False,
+                                        verbose_name='рецептов')
+    followers_count = models.IntegerField(default=0, editable=False,
+                                          verbose_name='подписчиков')
 
     objects = MyUserManager()
 
@@ -20,6 +20,9 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
     def get_is_subscribed(self, obj):
+        subscriptions = self.context.get('subscriptions')
+        if subscriptions is not None:
+            return obj.id in subscriptions
         return Subscription.objects.filter(
             author=obj, user__id=self.context['request'].user.id
         ).exists()
@@ -47,8 +50,7 @@ class ChangePasswordSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('укажите пароль пользователя')
         if user.check_password(value):
             return value
-        else:
-            raise serializers.ValidationError('неверный пароль пользователя')
+        raise serializers.ValidationError('неверный пароль пользователя')
 
     def validate_new_password(self, request, value):
         user = request.user or self.user
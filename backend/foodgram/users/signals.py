@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=Token)
+def invalidate_token_cache(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list(
+            'key', flat=True
+        ):
+            invalidate_token(key)
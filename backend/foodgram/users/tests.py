@@ -0,0 +1,95 @@
+import importlib.util
+import os
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from foodgram import settings as project_settings
+from .authentication import CachedTokenAuthentication, local_tokens
+from .models import User
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.token = Token.objects.create(user=User.objects.create(
+            email='user@example.com', username='user'
+        ))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def me(self):
+        return self.client.get('/api/users/me/').status_code
+
+    @override_settings(TOKEN_CACHE_TTL=0)
+    def test_token_revoked_by_another_process(self):
+        self.assertEqual(self.me(), 200)
+        with mock.patch('users.signals.invalidate_token'):
+            self.token.delete()
+        self.assertEqual(self.me(), 401)
+
+    @override_settings(TOKEN_CACHE_TTL=300)
+    def test_cached_token_revoked_by_this_process(self):
+        self.assertEqual(self.me(), 200)
+        self.token.delete()
+        self.assertEqual(self.me(), 401)
+
+    @override_settings(TOKEN_CACHE_TTL=300)
+    def test_warm_cache_skips_database(self):
+        authentication = CachedTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        for clear in (lambda: None, local_tokens.clear):
+            clear()
+            with self.assertNumQueries(0):
+                user, token = authentication.authenticate_credentials(
+                    self.token.key
+                )
+            self.assertEqual(user.id, self.token.user_id)
+            self.assertEqual(token, self.token)
+
+    @override_settings(TOKEN_CACHE_TTL=300)
+    def test_password_change_invalidates_credentials(self):
+        authentication = CachedTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        user = User.objects.get(id=self.token.user_id)
+        user.set_password('new-password')
+        user.save()
+        with self.assertNumQueries(1):
+            user, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertTrue(user.check_password('new-password'))
+
+    @override_settings(TOKEN_CACHE_TTL=300)
+    def test_logout_invalidates_credentials(self):
+        self.assertEqual(self.me(), 200)
+        self.assertEqual(
+            self.client.post('/api/auth/token/logout/').status_code, 204
+        )
+        self.assertEqual(self.me(), 401)
+
+
+class TokenCacheSettingsTests(SimpleTestCase):
+    def load_settings(self, **environ):
+        spec = importlib.util.spec_from_file_location(
+            'settings_copy', project_settings.__file__
+        )
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, environ):
+            os.environ.pop('TOKEN_CACHE_TTL', None)
+            with mock.patch('environ.Env.read_env'):
+                spec.loader.exec_module(module)
+        return module
+
+    def test_ttl_follows_shared_cache(self):
+        for url, shared, ttl in (('locmemcache://', False, 0),
+                                 ('dummycache://', False, 0),
+                                 ('memcache://memcached:11211', True, 300)):
+            with self.subTest(url):
+                module = self.load_settings(CACHE_URL=url)
+                self.assertEqual(
+                    (module.SHARED_CACHE, module.TOKEN_CACHE_TTL),
+                    (shared, ttl)
+                )
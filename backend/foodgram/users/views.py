@@ -7,9 +7,15 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 
-from recipes.models import Subscription
+from recipes.models import Recipe, Subscription
 from recipes.paginators import RecipePagination
-from recipes.serializers import SubscribeSerializer, SubscriptionSerializer
+from recipes.projections import (
+    USER_FIELDS, project_subscriptions, project_users,
+)
+from recipes.serializers import (
+    SubscribeSerializer, get_recipes_limit, subscribe_context,
+)
+from recipes.toggles import link, unlink
 from recipes.validators import validate_subscribe
 from .models import User
 from .serializers import ChangePasswordSerializer, UserSerializer
@@ -59,35 +65,42 @@ class UserViewSet(mixins.CreateModelMixin,
         except ValidationError:
             return Response('новый пароль некорректен')
         instance.set_password(new_password)
-        instance.save()
+        instance.save(update_fields=['password'])
         return Response(HTTPStatus.OK)
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *USER_FIELDS
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(project_users(list(queryset), request))
+        return self.get_paginated_response(project_users(page, request))
+
     @action(detail=False, methods=['get'],
             permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
-        context = {'request': request}
-        queryset = User.objects.filter(followings__user__id=request.user.id)
+        queryset = User.objects.filter(
+            followings__user__id=request.user.id
+        ).values(*USER_FIELDS, 'recipes_count')
         page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = SubscribeSerializer(
-                page, many=True, context=context
+        authors = list(queryset) if page is None else page
+        data = project_subscriptions(
+            authors, Recipe.objects.latest_by_author(
+                [author['id'] for author in authors],
+                get_recipes_limit(request)
             )
-            return self.get_paginated_response(serializer.data)
-
-        serializer = SubscribeSerializer(
-            queryset, many=True, context=context
         )
-        return Response(serializer.data)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
 
 
 @api_view(['get', 'delete'])
 def subscription_view(request, user_id):
     user = request.user
-    context = {'request': request}
-    author = get_object_or_404(
-        User, id=user_id,
-    )
     if request.method == 'GET':
+        author = get_object_or_404(User, id=user_id)
         try:
             validate_subscribe(user, author)
         except ValidationError:
@@ -95,18 +108,14 @@ def subscription_view(request, user_id):
                 'вы не можете подписаться на себя',
                 status=HTTPStatus.BAD_REQUEST
             )
-        data = {'user': user.id, 'author': author.id}
-        serializer = SubscriptionSerializer(data=data, context=context)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        serializer = SubscribeSerializer(author, context=context)
-        return Response(serializer.data, status=HTTPStatus.CREATED)
-    elif request.method == 'DELETE':
-        try:
-            instance = Subscription.objects.get(author=author, user=user)
-            instance.delete()
-            return Response(status=HTTPStatus.NO_CONTENT)
-        except Exception:
-            return Response(
-                'вы не подписаны', status=HTTPStatus.BAD_REQUEST
-            )
+        created = link(Subscription(user=user, author=author))
+        serializer = SubscribeSerializer(
+            author, context=subscribe_context(request, [author])
+        )
+        return Response(
+            serializer.data,
+            status=HTTPStatus.CREATED if created else HTTPStatus.OK
+        )
+    if not unlink(Subscription, user=user, author_id=user_id):
+        get_object_or_404(User, id=user_id)
+    return Response(status=HTTPStatus.NO_CONTENT)